@@ -0,0 +1,281 @@
+"""
+End to end benchmark of preMatchPreparation, afterToss and getInsights against a local stand-in for the ESPN sites.
+
+The stand-in is an http server on 127.0.0.1 that serves recorded pages (squad pages, athlete json, player matches
+pages, stats engine pages and match json) from an http cache folder, e.g. the DataBase/httpCache of a normal run of
+the fixtures. main.hostOverrides sends every request of the session to it, without any rate limit.
+Each repetition runs in an empty temporary folder (with a copy of reports for the insights) so every page is
+downloaded again, pages that aren't recorded are answered with a 404 and listed at the end.
+
+python benchmarkSuite.py fixtures.json                                  --> best of 3 repetitions of each fixture
+python benchmarkSuite.py fixtures.json --output before.json             --> also save the results
+python benchmarkSuite.py fixtures.json --compare before.json            --> compare with the results of another commit
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import main
+
+repositoryFolder = os.path.dirname(os.path.abspath(__file__))
+recordingsFolder = os.path.join(repositoryFolder, main.httpCacheFolder)
+standInHosts = ["www.espncricinfo.com", "stats.espncricinfo.com", "core.espnuk.org", "site.api.espn.com",
+                "hsapi.espncricinfo.com", "static.espncricinfo.com"]
+missingPages = set()
+requestLatencies = []
+requestLatenciesLock = threading.Lock()
+
+# stage --> function of main.py, in the order they run
+benchmarkStages = {
+    "PRE_MATCH": main.preMatchPreparation,
+    "AFTER_TOSS": main.afterToss,
+    "INSIGHTS": main.getInsights
+}
+
+
+def readRecordedPage(url) -> tuple or None:
+    """
+    Recorded response of the url, looked up like main.readHttpCacheEntry but in recordingsFolder
+    :param url: str
+    :return: tuple --> (status, headers dict, body bytes) or None
+    """
+    entry_path = os.path.join(recordingsFolder, "entries", main.getHttpCacheEntryName(url))
+    if not os.path.isfile(entry_path):
+        return None
+    with open(entry_path) as json_file:
+        entry = json.load(json_file)
+    with gzip.open(os.path.join(recordingsFolder, "bodies", f"{entry['BODY']}.gz"), "rb") as body_file:
+        return entry["STATUS"], entry["HEADERS"], body_file.read()
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve the recorded page of the url asked for, the site comes from the Host header (see main.hostOverrides)
+    """
+    protocol_version = "HTTP/1.1"
+    # headers & body are separate writes, with Nagle each keep-alive response waits for the delayed ack
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        host = self.headers.get("Host", "").split(":")[0]
+        page = readRecordedPage(f"https://{host}{self.path}") or readRecordedPage(f"http://{host}{self.path}")
+        if page is None:
+            missingPages.add(f"{host}{self.path}")
+            status, headers, body = 404, {}, b""
+        else:
+            status, headers, body = page
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class BenchmarkSession(main.RateLimitedSession):
+    """
+    Session of main.py that also keeps the latency of every request sent to the stand-in
+    """
+
+    def sendRequest(self, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().sendRequest(method, url, *args, **kwargs)
+        finally:
+            with requestLatenciesLock:
+                requestLatencies.append(time.perf_counter() - start)
+
+
+def startStandIn() -> ThreadingHTTPServer:
+    """
+    Start the stand-in server on a free port and point the ESPN hosts of main.py to it
+    :return: ThreadingHTTPServer
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for host in standInHosts:
+        main.hostOverrides[host] = f"127.0.0.1:{server.server_address[1]}"
+    return server
+
+
+def resetMainState() -> None:
+    """
+    Forget everything main.py keeps in memory about the folder of the previous repetition
+    :return: None
+    """
+    main.directoryManifest.clear()
+    main.matchSummaries.clear()
+    main.playerHistoryReady = False
+    main.internationalRecordsLinks = None
+    main.playerIdentities = None
+    main.requestsPerSecond = 0
+    main.httpSession = BenchmarkSession(main.httpPoolSize)
+    pass
+
+
+def getPercentile(values, percentile) -> float:
+    """
+    Nearest rank percentile
+    :param values: list
+    :param percentile: int
+    :return: float
+    """
+    if len(values) == 0:
+        return 0
+    values = sorted(values)
+    rank = max(1, round(percentile / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def runRepetition(fixture, stages, verbose) -> dict:
+    """
+    1. Empty temporary folder with a copy of reports, main.py state reset
+    2. Run the stages of the fixture one after the other, timing each
+    :param fixture: dict --> see main.loadFixtures
+    :param stages: list
+    :param verbose: bool --> keep the prints of main.py
+    :return: dict
+    """
+    # 1. Empty temporary folder with a copy of reports, main.py state reset
+    working_folder = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        if os.path.isdir(os.path.join(repositoryFolder, "reports")):
+            shutil.copytree(os.path.join(repositoryFolder, "reports"), "reports")
+        resetMainState()
+        del requestLatencies[:]
+
+        # 2. Run the stages of the fixture one after the other, timing each
+        stage_seconds = {}
+        error = None
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        try:
+            with output:
+                main.checkDirectory()
+                main.loadFixtureInputs(fixture)
+                for stage in stages:
+                    start = time.perf_counter()
+                    benchmarkStages[stage]()
+                    stage_seconds[stage] = time.perf_counter() - start
+        except Exception as e:
+            error = repr(e)
+        finally:
+            os.chdir(working_folder)
+
+    return {
+        "STAGE_SECONDS": stage_seconds,
+        "SECONDS": sum(stage_seconds.values()),
+        "PLAYERS": len(main.bothSquadDetails),
+        "LATENCIES": list(requestLatencies),
+        "ERROR": error
+    }
+
+
+def benchmarkFixture(fixture, stages, repeat, verbose) -> dict:
+    """
+    Best repetition of the fixture for the throughput, every repetition for the latency percentiles
+    :param fixture: dict
+    :param stages: list
+    :param repeat: int
+    :param verbose: bool
+    :return: dict
+    """
+    repetitions = [runRepetition(fixture, stages, verbose) for i in range(repeat)]
+    finished = [repetition for repetition in repetitions if repetition["ERROR"] is None] or repetitions
+    best = min(finished, key=lambda repetition: repetition["SECONDS"])
+    latencies = [latency for repetition in repetitions for latency in repetition["LATENCIES"]]
+    seconds = best["SECONDS"] or float("inf")
+    return {
+        "MATCH_URL": fixture["MATCH_URL"],
+        "SECONDS": best["SECONDS"],
+        "STAGE_SECONDS": {stage: getPercentile([repetition["STAGE_SECONDS"].get(stage, 0)
+                                                for repetition in repetitions], 50) for stage in stages},
+        "PLAYERS_PER_SECOND": best["PLAYERS"] / seconds,
+        "PAGES_PER_SECOND": len(best["LATENCIES"]) / seconds,
+        "PAGES": len(best["LATENCIES"]),
+        "LATENCY_MS": {f"P{percentile}": getPercentile(latencies, percentile) * 1000 for percentile in [50, 90, 99]},
+        "ERRORS": sorted({repetition["ERROR"] for repetition in repetitions if repetition["ERROR"] is not None})
+    }
+
+
+def getCommit() -> str or None:
+    """
+    Commit of the checked out tree, so saved results can be told apart
+    :return: str or None
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repositoryFolder, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def printResults(results, previous=None) -> None:
+    """
+    One line per fixture, with the change from the previous results when comparing
+    :param results: list
+    :param previous: list or None
+    :return: None
+    """
+    previous_results = {result["MATCH_URL"]: result for result in previous or []}
+    print(f"{'SECONDS':>9}{'PLAYERS/s':>11}{'PAGES/s':>10}{'PAGES':>7}{'P50 ms':>9}{'P90 ms':>9}{'P99 ms':>9}  MATCH")
+    for result in results:
+        latency = result["LATENCY_MS"]
+        print(f"{result['SECONDS']:>9.2f}{result['PLAYERS_PER_SECOND']:>11.2f}{result['PAGES_PER_SECOND']:>10.1f}"
+              f"{result['PAGES']:>7}{latency['P50']:>9.1f}{latency['P90']:>9.1f}{latency['P99']:>9.1f}"
+              f"  {result['MATCH_URL']}")
+        print("         " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result["STAGE_SECONDS"].items()))
+        if result["MATCH_URL"] in previous_results:
+            before = previous_results[result["MATCH_URL"]]
+            change = (result["SECONDS"] - before["SECONDS"]) / (before["SECONDS"] or float("inf")) * 100
+            print(f"         was {before['SECONDS']:.2f}s & {before['PAGES_PER_SECOND']:.1f} pages/s ({change:+.1f}%)")
+        for error in result["ERRORS"]:
+            print(f"         error: {error}")
+    pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark main.py end to end against a local stand-in for ESPN")
+    parser.add_argument("fixtures", help="fixtures json file, same format as main.py --batch")
+    parser.add_argument("--recordings", default=recordingsFolder, help="http cache folder with the recorded pages")
+    parser.add_argument("--stages", nargs="+", choices=list(benchmarkStages), default=list(benchmarkStages),
+                        help="stages to run for each fixture")
+    parser.add_argument("--repeat", type=int, default=3, help="run each fixture this many times")
+    parser.add_argument("--output", metavar="FILE", help="save the results as json")
+    parser.add_argument("--compare", metavar="FILE", help="results saved by --output of another commit")
+    parser.add_argument("--verbose", action="store_true", help="keep the prints of main.py")
+    arguments = parser.parse_args()
+
+    recordingsFolder = os.path.abspath(arguments.recordings)
+    fixtures = main.loadFixtures(arguments.fixtures)
+    startStandIn()
+
+    benchmarkResults = [benchmarkFixture(fixture, arguments.stages, arguments.repeat, arguments.verbose)
+                        for fixture in fixtures]
+
+    previousResults = None
+    if arguments.compare:
+        with open(arguments.compare) as json_file:
+            previousResults = json.load(json_file)["RESULTS"]
+    printResults(benchmarkResults, previousResults)
+    if len(missingPages) > 0:
+        print(f"\n{len(missingPages)} pages aren't recorded in {recordingsFolder}, e.g. {sorted(missingPages)[0]}")
+
+    if arguments.output:
+        with open(arguments.output, "w") as json_file:
+            json.dump({"COMMIT": getCommit(), "STAGES": arguments.stages, "RESULTS": benchmarkResults}, json_file,
+                      indent=4)
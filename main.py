@@ -3,25 +3,420 @@ Project Name: Cricket Prediction
 Project Moto: To predict the upcoming match result and player performance (Machine Learning)
 Project Description:
 """
+from __future__ import annotations
+
+import argparse
+import csv
+import difflib
+import functools
+import gzip
+import hashlib
+import importlib
 import json
+import operator
 import os
 import re
 import time
 import timeit
-from typing import Union
+from typing import TYPE_CHECKING, Union
 import shutil
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from types import SimpleNamespace
+import unicodedata
 
-import pandas as pd
-from bs4 import BeautifulSoup
-from espncricinfo.match import Match
-import matplotlib.pyplot as plt
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+if TYPE_CHECKING:
+    import espncricinfo.match
+
+
+class LazyModule:
+    """
+    Module that is only imported when one of its attributes is first used, so the heavy dependencies are loaded by
+    the stages that need them instead of at start up. espncricinfo & matplotlib are imported inside getMatch and
+    saveInsightCharts.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+
+    def __getattr__(self, attribute):
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+        return getattr(self.module, attribute)
+
+
+pd = LazyModule("pandas")
+bs4 = LazyModule("bs4")
+
+
+def normalizeName(name) -> str:
+    """
+    Name as it is compared between the squad, the playing xi & user input: accents and dots removed, case folded,
+    single spaces
+    :param name: str
+    :return: str
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(character for character in name if not unicodedata.combining(character))
+    return " ".join(name.replace(".", "").casefold().split())
+
+
+class PlayerRecord:
+    """
+    Details, forms & predictions of one player. __slots__ keep each record small when tens of thousands of players
+    are loaded, the squad json keeps the upper case keys of detailsKeys
+    """
+    # squad json key --> attribute, in the order of the json
+    detailsKeys = {
+        "NAME": "name", "ID": "id", "AGE": "age", "POSITION": "position", "URL": "url",
+        "PLAYING_11_STATUS": "playing11Status", "RECENT_FORM": "recentForm", "RECENT_CLASS_FORM": "recentClassForm",
+        "INT_CLASS_FORM": "intClassForm", "INTERNATIONAL_FORM": "internationalForm", "EXPERTS_CHOICE": "expertsChoice",
+        "PREDICTION": "prediction", "RECENT_PREDICTION": "recentPrediction", "INT_PREDICTION": "intPrediction",
+        "BAT_STYLE": "batStyle", "BALL_STYLE": "ballStyle"
+    }
+    __slots__ = list(detailsKeys.values())
+
+    def __init__(self, player_id, name, age=None, position=None, url=None, bat_style=None, ball_style=None):
+        self.id = int(player_id)
+        self.name = name
+        self.age = age
+        self.position = position
+        self.url = url
+        self.batStyle = bat_style
+        self.ballStyle = ball_style
+        self.playing11Status = False
+        self.recentForm = 0
+        self.recentClassForm = 0
+        self.intClassForm = 0
+        self.internationalForm = 0
+        self.expertsChoice = 0
+        self.prediction = 0
+        self.recentPrediction = 0
+        self.intPrediction = 0
+
+    @classmethod
+    def fromDetails(cls, details) -> PlayerRecord:
+        """
+        Record of a squad json details dict
+        :param details: dict
+        :return: PlayerRecord
+        """
+        record = cls(details["ID"], details["NAME"])
+        for key, attribute in cls.detailsKeys.items():
+            if key != "ID" and key in details:
+                setattr(record, attribute, details[key])
+        return record
+
+    def toDetails(self) -> dict:
+        """
+        Details dict of the squad json, the styles are left out when the player has none
+        :return: dict
+        """
+        details = {key: getattr(self, attribute) for key, attribute in self.detailsKeys.items()}
+        details["ID"] = str(self.id)
+        for key in ["BAT_STYLE", "BALL_STYLE"]:
+            if details[key] is None:
+                del details[key]
+        return details
+
+
+class PlayerRegistry:
+    """
+    Players of the match in squad order, looked up in O(1) by id (str or int, stored as int) or by normalized name.
+    When two players share a normalized name the last one added is found by name
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.idsByName = {}
+
+    def add(self, record) -> None:
+        self.records[record.id] = record
+        self.idsByName[normalizeName(record.name)] = record.id
+
+    def get(self, player_id) -> Union[PlayerRecord, None]:
+        return self.records.get(int(player_id))
+
+    def findByName(self, name) -> Union[PlayerRecord, None]:
+        player_id = self.idsByName.get(normalizeName(name))
+        return None if player_id is None else self.records[player_id]
+
+    def ids(self) -> list:
+        return list(self.records)
+
+    def __contains__(self, player_id):
+        return int(player_id) in self.records
+
+    def __iter__(self):
+        return iter(list(self.records.values()))
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def fromDetails(cls, squad_details) -> PlayerRegistry:
+        """
+        Registry of a squad json, player id: details dict
+        :param squad_details: dict
+        :return: PlayerRegistry
+        """
+        registry = cls()
+        for details in squad_details.values():
+            registry.add(PlayerRecord.fromDetails(details))
+        return registry
+
+    def toDetails(self) -> dict:
+        """
+        Squad json of the registry, player id: details dict
+        :return: dict
+        """
+        return {str(player_id): record.toDetails() for player_id, record in self.records.items()}
+
+
+def getInitialsName(name) -> str:
+    """
+    Normalized name with the first names shortened to initials: virat kohli --> v kohli, ms dhoni stays ms dhoni
+    :param name: str --> normalized name
+    :return: str
+    """
+    tokens = name.split()
+    initials = "".join(token if len(token) <= 2 else token[0] for token in tokens[:-1])
+    return f"{initials} {tokens[-1]}".strip() if len(tokens) > 0 else ""
+
+
+def isInitialsName(name) -> bool:
+    """
+    Check if the first names of the normalized name are written as initials: v kohli, ms dhoni
+    :param name: str --> normalized name
+    :return: bool
+    """
+    tokens = name.split()
+    return len(tokens) >= 2 and all(len(token) <= 2 for token in tokens[:-1])
+
+
+def getNameSimilarity(name, other_name) -> float:
+    """
+    Similarity of two normalized names between 0 and 1. A name written with initials (v kohli) or without one of
+    the middle names (shaheen afridi) of the other one scores as high as a typo. Two full names are compared letter
+    by letter, but their first names & surnames must each be at most one typo apart so virat kohli & vikram kohli
+    stay apart. Names that can't reach nameMatchCutoff - nameMatchMargin score 0, they can't change which player
+    matches
+    :param name: str
+    :param other_name: str
+    :return: float
+    """
+    if (isInitialsName(name) or isInitialsName(other_name)) and getInitialsName(name) == getInitialsName(other_name):
+        return 0.95
+    tokens, other_tokens = name.split(), other_name.split()
+    shorter, longer = sorted([tokens, other_tokens], key=len)
+    if 2 <= len(shorter) < len(longer) and shorter[0] == longer[0] and shorter[-1] == longer[-1] \
+            and set(shorter) <= set(longer):
+        return 0.9
+    matcher = difflib.SequenceMatcher(None, name, other_name)
+    lowest_score = nameMatchCutoff - nameMatchMargin
+    if matcher.real_quick_ratio() < lowest_score or matcher.quick_ratio() < lowest_score:
+        return 0
+    for part, other_part in [(" ".join(tokens[:-1]), " ".join(other_tokens[:-1])), (tokens[-1], other_tokens[-1])]:
+        part_matcher = difflib.SequenceMatcher(None, part, other_part)
+        matched = sum(block.size for block in part_matcher.get_matching_blocks())
+        # a typo is one letter added, dropped or replaced (= dropped + added)
+        if len(part) + len(other_part) - 2 * matched > 2:
+            return 0
+    return matcher.ratio()
+
+
+class PlayerIdentityIndex:
+    """
+    Every player ever seen (squads, playing xis, match details) with the player's full name, known as name and the
+    aliases typed for the player. Names are found by normalized name, else by fuzzy match against the given candidates or the names
+    sharing a block (the surname, its first 3 letters or the initials name, first names are too common to block on)
+    so a lookup compares a handful of names, not every player
+    """
+
+    def __init__(self):
+        self.identities = {}
+        self.idsByName = {}
+        self.blocks = {}
+        self.changed = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def getBlockKeys(name) -> set:
+        tokens = name.split()
+        if len(tokens) == 0:
+            return set()
+        return {tokens[-1], tokens[-1][:3], getInitialsName(name)}
+
+    def add(self, player_id, name=None, known_as=None, alias=None) -> None:
+        """
+        Add the player or the names the player isn't known by yet
+        :param player_id: int or str
+        :param name: str --> full name
+        :param known_as: str
+        :param alias: str --> any other name the player was written as
+        :return: None
+        """
+        player_id = int(player_id)
+        with self.lock:
+            identity = self.identities.setdefault(player_id, {"NAME": None, "KNOWN_AS": None, "ALIASES": []})
+            for key, value in [("NAME", name), ("KNOWN_AS", known_as)]:
+                if value is not None and identity[key] is None:
+                    identity[key] = value
+                    self.changed = True
+            if alias is not None and normalizeName(alias) not in self.getNames(player_id):
+                identity["ALIASES"].append(alias)
+                self.changed = True
+            for normalized_name in self.getNames(player_id):
+                self.idsByName.setdefault(normalized_name, set()).add(player_id)
+                for block_key in self.getBlockKeys(normalized_name):
+                    self.blocks.setdefault(block_key, set()).add(normalized_name)
+        pass
+
+    def getDisplayName(self, player_id) -> Union[str, None]:
+        with self.lock:
+            identity = self.identities.get(int(player_id), {})
+            return identity.get("NAME") or identity.get("KNOWN_AS")
+
+    def getNames(self, player_id) -> set:
+        identity = self.identities.get(int(player_id), {"NAME": None, "KNOWN_AS": None, "ALIASES": []})
+        names = [identity["NAME"], identity["KNOWN_AS"]] + identity["ALIASES"]
+        return {normalizeName(name) for name in names if name is not None}
+
+    def find(self, name, candidate_ids=None, fuzzy=True) -> Union[int, None]:
+        """
+        1. Player whose normalized name is the name
+        2. Else (when fuzzy) the player with the most similar name, at least nameMatchCutoff and nameMatchMargin
+        ahead of any other player
+        :param name: str
+        :param candidate_ids: iterable --> only look among these players (e.g. the squad), defaults to everybody
+        :param fuzzy: bool
+        :return: int or None --> None when no player (or more than one) matches
+        """
+        normalized_name = normalizeName(name)
+        if candidate_ids is not None:
+            candidate_ids = {int(player_id) for player_id in candidate_ids}
+
+        with self.lock:
+            # 1. Player whose normalized name is the name
+            ids = self.idsByName.get(normalized_name, set())
+            if candidate_ids is not None:
+                ids = ids & candidate_ids
+            if len(ids) == 1:
+                return next(iter(ids))
+            if len(ids) > 1 or not fuzzy:
+                return None
+
+            # 2. Else the player with the most similar name
+            if candidate_ids is not None:
+                candidates = [(player_id, other_name) for player_id in candidate_ids
+                              for other_name in self.getNames(player_id)]
+            else:
+                other_names = set()
+                for block_key in self.getBlockKeys(normalized_name):
+                    other_names |= self.blocks.get(block_key, set())
+                candidates = [(player_id, other_name) for other_name in other_names
+                              for player_id in self.idsByName[other_name]]
+
+        scores = {}
+        for player_id, other_name in candidates:
+            scores[player_id] = max(scores.get(player_id, 0), getNameSimilarity(normalized_name, other_name))
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if len(ranked) == 0 or ranked[0][1] < nameMatchCutoff:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < nameMatchMargin:
+            return None
+        return ranked[0][0]
+
+    def toJson(self) -> dict:
+        with self.lock:
+            return {str(player_id): dict(identity, ALIASES=list(identity["ALIASES"]))
+                    for player_id, identity in self.identities.items()}
+
+    def addJson(self, identities) -> None:
+        """
+        Add the identities of a saved index
+        :param identities: dict --> player id: {"NAME", "KNOWN_AS", "ALIASES"}
+        :return: None
+        """
+        for player_id, identity in identities.items():
+            self.add(player_id, identity["NAME"], identity["KNOWN_AS"])
+            for alias in identity["ALIASES"]:
+                self.add(player_id, alias=alias)
+        pass
+
 
 # Global Variable
 # global bothSquadDetails
-bothSquadDetails = {}
-sleepTime = 1
+bothSquadDetails = PlayerRegistry()
+playerIdentities = None
+playerIdentitiesLock = threading.Lock()
+playerIdentitiesPath = "DataBase/playerIdentities.json"
+# fuzzy name match: similarity needed & lead over the second best player
+nameMatchCutoff = 0.85
+nameMatchMargin = 0.05
+requestsPerSecond = 1
+hostRequestsPerSecond = {}
+# host --> host:port of a local stand-in for that site (benchmarkSuite.py), requests are sent there over http with the
+# original Host header, the http cache and the metrics still use the original url
+hostOverrides = {}
+httpPoolSize = 16
+httpSession = None
+httpSessionLock = threading.Lock()
+offlineMode = False
+httpCacheFolder = "DataBase/httpCache"
+# record/replay archives have the layout of the http cache (entries & bodies), --record saves every response the
+# session returns (from the network or the http cache, any status) & --replay serves them back without any network
+recordFolder = None
+replayFolder = None
+# (url part, seconds a cached response stays fresh), first match wins
+httpCacheTtl = [
+    ("/match-squads", 6 * 60 * 60),
+    ("core.espnuk.org/v2/sports/cricket/athletes", 7 * 24 * 60 * 60),
+    ("stats.espncricinfo.com/ci/engine/player", 24 * 60 * 60),
+    ("/matches/engine/match", 15 * 60),
+    ("/cricketers/", 24 * 60 * 60)
+]
+defaultHttpCacheTtl = 60 * 60
+# player pages (profile, matches table & stats engine records) a --refresh downloads again when they were cached
+# before the run started, whatever their ttl, so the matches played since are found
+refreshHttpPages = ["stats.espncricinfo.com/ci/engine/player", "/cricketers/"]
+runStartedAt = time.time()
+matchSummaries = OrderedDict()
+matchSummariesSize = 2048
+matchSummariesLock = threading.Lock()
+# Match attributes kept in DataBase/matchDetails for the match reports
+matchDetailsAttributes = ["match_class", "series_name", "ground_name", "match_title", "lighting", "result", "status",
+                          "home_team", "team_1_abbreviation", "team_2_abbreviation", "batting_first", "match_winner"]
+playerHistoryPath = "DataBase/playerHistory.sqlite"
+playerHistoryReady = False
+# SoupStrainer arguments of each scraper, only the tags it reads are built into the soup
+squadStrainer = {"name": "tbody"}
+tabWidgetsStrainer = {"name": "a", "class_": "ds-h-10"}
+recentMatchesStrainer = {"name": ["th", "td"]}
+internationalRecordsStrainer = {"name": ["table", "tr"], "class_": ["engineTable", "headlinks"]}
+wicketPoints = 25
+# history --> (runs column, wickets column) used for PERFORMANCE
+performanceColumns = {"recentMatchRecords": ("BAT", "BOWL"), "internationalMatchRecords": ("BAT", "BALL")}
+internationalRecordsLinks = None
+directoryManifest = {}
+directoryManifestLock = threading.Lock()
 totalPlayers = 0
 pagesLeft = 0
 matchUrl = ""
@@ -29,6 +424,664 @@ vpnStatus = "n"
 matchClass = ""
 currentYear = 0
 intPeriod = 0
+squadDownloadWorkers = 8
+matchDownloadWorkers = 8
+progressLock = threading.Lock()
+# refresh stored player histories with the matches played since, instead of skipping them
+refreshHistories = False
+# fixture being run by --batch, None in the interactive run
+batchFixture = None
+reportsFolder = "currentMatchReports"
+# lock files shared by the processes downloading into the same DataBase, threads share the locks of threadLocks
+# (name --> [lock, number of threads holding or waiting for it], removed when nobody uses it)
+lockFolder = "DataBase/locks"
+threadLocks = {}
+threadLocksLock = threading.Lock()
+# worker process of a --batch run with --jobs, other processes download into the same DataBase
+batchWorker = False
+# metrics of the run: STAGES seconds, HOSTS requests/seconds/bytes/errors, CACHES hits/misses & ROWS written,
+# with --metrics each stage and the summary are also appended to metricsFile as json lines
+metrics = {}
+metricsLock = threading.Lock()
+metricsFile = None
+# every row of reports/results/{match id}.csv with the match id & class, kept up to date by createReport
+allResultsPath = "reports/allResults.csv"
+# match index: reports/allMatchesData.csv is only ever appended to (under the allMatchesData lock), matchIndex holds
+# its match ids read up to matchIndexOffset so an existence check only reads the rows other processes added since
+allMatchesDataPath = "reports/allMatchesData.csv"
+allMatchesDataColumns = ["MATCH_ID", "SERIES_NAME", "GROUND_NAME", "MATCH_CLASS", "MATCH_TITLE", "LIGHTING", "MATCH_RUNS",
+                         "MATCH_WICKETS", "HOME_TEAM", "AWAY_TEAM", "BATTING_FIRST", "WINNER", "WINNING_SIDE",
+                         "MATCH_REPORT_FILE_PATH"]
+matchIndex = set()
+matchIndexOffset = 0
+matchIndexLock = threading.Lock()
+# insight charts: (POSITION of the players or None for all, file name, x label, title)
+insightCharts = [
+    (None, "recent_prediction", "RECENT PREDICTION", "FREQUENCY BASED ON RECENT PREDICTION RESULTS"),
+    ("2 Batsmen", "batting", "RECENT PREDICTION of BATTING", "BATTING FREQUENCY BASED ON RECENT PREDICTION RESULTS"),
+    ("4 Bowler", "bowling", "RECENT PREDICTION of BOWLING", "BOWLING FREQUENCY BASED ON RECENT PREDICTION RESULTS"),
+    ("3 All Rounder", "all_rounder", "RECENT PREDICTION of ALL ROUNDERS",
+     "ALL ROUNDERS FREQUENCY BASED ON RECENT PREDICTION RESULTS"),
+    ("1 Wicketkeeper", "Wicketkeeper", "RECENT PREDICTION of WICKET KEEPERS",
+     "WICKET KEEPERS FREQUENCY BASED ON RECENT PREDICTION RESULTS")
+]
+# png or svg charts, or json with the frequencies of all the charts (insights.json)
+insightsFormat = "png"
+reportColumns = ['NAME', 'POSITION', 'GROUND', 'TEAM_NAME', 'VS_TEAM', 'HOME_AWAY', 'TARGET_CHASE', 'RECENT_FORM',
+                 'INT_FORM', 'INT_CLASS_FORM', 'RECENT_CLASS_FORM', 'RECENT_PREDICTION', 'INT_PREDICTION', 'DREAM11']
+lockPollSeconds = 0.2
+# completed (history, player id) units of the interrupted runs of the current match, see loadRunJournal
+journalFolder = "DataBase/journals"
+runJournal = set()
+runJournalLock = threading.Lock()
+# forget the journal of the current match and download every player again (--restart)
+restartRuns = False
+# with --refresh, units journaled longer ago than this are downloaded again (their matches may have been played since)
+journalMaxAgeSeconds = 24 * 60 * 60
+
+
+def lockProcessFile(lock_path) -> int:
+    """
+    Open & lock the lock file, flock waits while another process holds it (Windows polls with locking). A holder
+    removes the file before releasing it, so the lock taken on a file that was removed meanwhile is let go and the
+    new file is locked instead
+    :param lock_path: str
+    :return: int --> file descriptor of the locked file
+    """
+    while True:
+        lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT)
+        if fcntl is None:
+            while True:
+                try:
+                    msvcrt.locking(lock_fd, msvcrt.LK_NBLCK, 1)
+                    return lock_fd
+                except OSError:
+                    time.sleep(lockPollSeconds)
+
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        try:
+            if os.stat(lock_path).st_ino == os.fstat(lock_fd).st_ino:
+                return lock_fd
+        except FileNotFoundError:
+            pass
+        # closing the file releases the flock
+        os.close(lock_fd)
+
+
+@contextmanager
+def fileLock(name, across_processes=True):
+    """
+    Hold the lock `name` across threads and (unless across_processes is False) processes, waiting while somebody else
+    holds it. Processes lock DataBase/locks/{name}.lock with flock (locking on Windows), the operating system
+    releases the lock of a killed process so there are no stale locks to take over. The lock file (and the thread
+    lock) is removed by the last one holding it.
+    :param name: str
+    :param across_processes: bool
+    """
+    with threadLocksLock:
+        thread_lock = threadLocks.setdefault(name, [threading.Lock(), 0])
+        thread_lock[1] += 1
+    try:
+        with thread_lock[0]:
+            if not across_processes:
+                yield
+                return
+
+            lock_path = f"{lockFolder}/{name}.lock"
+            lock_fd = lockProcessFile(lock_path)
+            try:
+                yield
+            finally:
+                if fcntl is None:
+                    # an open file can't be removed on Windows, the lock file is kept
+                    msvcrt.locking(lock_fd, msvcrt.LK_UNLCK, 1)
+                else:
+                    os.remove(lock_path)
+                os.close(lock_fd)
+    finally:
+        with threadLocksLock:
+            thread_lock[1] -= 1
+            if thread_lock[1] == 0:
+                del threadLocks[name]
+
+
+@contextmanager
+def atomicWrite(file_path, mode="w"):
+    """
+    Write the file under a temporary name next to it and rename it over file_path once it is complete, so readers
+    (and the next run after a crash) only ever see the old or the whole new file
+    :param file_path: str
+    :param mode: str --> "w" or "wb"
+    """
+    temp_path = f"{file_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, mode, **({} if "b" in mode else {"newline": ""})) as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def writeJson(data, file_path) -> None:
+    """
+    Save data as json atomically
+    :param data: dict or list
+    :param file_path: str
+    :return: None
+    """
+    with atomicWrite(file_path) as json_file:
+        json.dump(data, json_file)
+    pass
+
+
+def writeCsv(df, file_path) -> None:
+    """
+    Save the DataFrame as csv (without index) atomically
+    :param df: DataFrame
+    :param file_path: str
+    :return: None
+    """
+    with atomicWrite(file_path) as csv_file:
+        df.to_csv(csv_file, index=False)
+    pass
+
+
+def appendCsv(df, file_path) -> None:
+    """
+    Add the rows of the DataFrame (without header & index) to the end of the csv with a single write, so an
+    interrupted run can't leave half a row behind
+    :param df: DataFrame
+    :param file_path: str
+    :return: None
+    """
+    rows = df.to_csv(header=False, index=False).encode("utf-8")
+    file_descriptor = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+    try:
+        while len(rows) > 0:
+            rows = rows[os.write(file_descriptor, rows):]
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+    pass
+
+
+def emitMetric(event) -> None:
+    """
+    Append the event to metricsFile as a json line, tagged with the match it belongs to
+    :param event: dict
+    :return: None
+    """
+    if metricsFile is None:
+        return
+    event = dict(event, MATCH_URL=matchUrl, TIME=round(time.time(), 3))
+    with metricsLock:
+        with open(metricsFile, "a") as metrics_file:
+            metrics_file.write(json.dumps(event) + "\n")
+    pass
+
+
+@contextmanager
+def stageTimer(stage):
+    """
+    Add the wall time of the block to the stage, a stage timed more than once adds up
+    :param stage: str --> squad, recent records, international records, match summaries, statistics, reports ...
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        with metricsLock:
+            stages = metrics.setdefault("STAGES", {})
+            stages[stage] = stages.get(stage, 0) + seconds
+        emitMetric({"EVENT": "stage", "STAGE": stage, "SECONDS": round(seconds, 3)})
+
+
+def recordHttpRequest(host, seconds, response) -> None:
+    """
+    Count a request sent to the host, with its latency and the bytes received (None response --> failed)
+    :param host: str
+    :param seconds: float
+    :param response: requests.Response or None
+    :return: None
+    """
+    with metricsLock:
+        host_metrics = metrics.setdefault("HOSTS", {}).setdefault(
+            host, {"REQUESTS": 0, "SECONDS": 0, "BYTES": 0, "ERRORS": 0})
+        host_metrics["REQUESTS"] += 1
+        host_metrics["SECONDS"] += seconds
+        if response is None or response.status_code >= 400:
+            host_metrics["ERRORS"] += 1
+        if response is not None:
+            host_metrics["BYTES"] += len(response.content)
+    pass
+
+
+def recordCache(cache, hit) -> None:
+    """
+    Count a hit or a miss of the cache
+    :param cache: str --> http, match summaries, match details, recentMatchRecords, internationalMatchRecords
+    :param hit: bool
+    :return: None
+    """
+    with metricsLock:
+        cache_metrics = metrics.setdefault("CACHES", {}).setdefault(cache, {"HITS": 0, "MISSES": 0})
+        cache_metrics["HITS" if hit else "MISSES"] += 1
+    pass
+
+
+def recordRows(table, rows) -> None:
+    """
+    Count the rows written to the table
+    :param table: str
+    :param rows: int
+    :return: None
+    """
+    with metricsLock:
+        table_rows = metrics.setdefault("ROWS", {})
+        table_rows[table] = table_rows.get(table, 0) + rows
+    pass
+
+
+def resetMetrics() -> None:
+    """
+    Start the metrics of a new run
+    :return: None
+    """
+    with metricsLock:
+        metrics.clear()
+    pass
+
+
+def printMetricsSummary() -> None:
+    """
+    Print the metrics of the run as tables and append them to metricsFile as a summary line
+    :return: None
+    """
+    with metricsLock:
+        summary = json.loads(json.dumps(metrics))
+
+    print(f"\n{'STAGE':<28}{'SECONDS':>10}")
+    for stage, seconds in summary.get("STAGES", {}).items():
+        print(f"{stage:<28}{seconds:>10.3f}")
+
+    print(f"\n{'HOST':<28}{'REQUESTS':>10}{'AVG ms':>10}{'KB':>10}{'ERRORS':>8}")
+    for host, host_metrics in summary.get("HOSTS", {}).items():
+        average_ms = host_metrics["SECONDS"] / host_metrics["REQUESTS"] * 1000
+        print(f"{host:<28}{host_metrics['REQUESTS']:>10}{average_ms:>10.1f}{host_metrics['BYTES'] / 1024:>10.0f}"
+              f"{host_metrics['ERRORS']:>8}")
+
+    print(f"\n{'CACHE':<28}{'HITS':>10}{'MISSES':>10}{'HIT %':>10}")
+    for cache, cache_metrics in summary.get("CACHES", {}).items():
+        hit_rate = cache_metrics["HITS"] / (cache_metrics["HITS"] + cache_metrics["MISSES"]) * 100
+        print(f"{cache:<28}{cache_metrics['HITS']:>10}{cache_metrics['MISSES']:>10}{hit_rate:>10.1f}")
+
+    print(f"\n{'ROWS':<28}{'WRITTEN':>10}")
+    for table, rows in summary.get("ROWS", {}).items():
+        print(f"{table:<28}{rows:>10}")
+
+    emitMetric(dict(summary, EVENT="summary"))
+    pass
+
+
+class TokenBucket:
+    """
+    Token bucket that lets `rate` requests per second through, with bursts of up to `capacity` requests.
+    A rate of 0 (or less) means no limit.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updatedAt = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        1. Refill the bucket for the time passed since the last request
+        2. Take one token, if the bucket is empty the token is borrowed and the caller waits until it is refilled
+        :return: None
+        """
+        if self.rate <= 0:
+            return
+
+        with self.lock:
+            # 1. Refill the bucket for the time passed since the last request
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updatedAt) * self.rate)
+            self.updatedAt = now
+
+            # 2. Take one token
+            self.tokens -= 1
+            wait_time = 0
+            if self.tokens < 0:
+                wait_time = -self.tokens / self.rate
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+        pass
+
+
+class RateLimitedSession(requests.Session):
+    """
+    Keep-alive requests session with a connection pool and a token bucket per host
+    """
+
+    def __init__(self, pool_size):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.buckets = {}
+        self.bucketsLock = threading.Lock()
+
+    def getBucket(self, host) -> TokenBucket:
+        """
+        Get the token bucket of the host, rate is taken from hostRequestsPerSecond else requestsPerSecond
+        :param host: str
+        :return: TokenBucket
+        """
+        with self.bucketsLock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(hostRequestsPerSecond.get(host, requestsPerSecond))
+            return self.buckets[host]
+
+    def request(self, method, url, *args, **kwargs):
+        """
+        1. Non GET requests go straight to the site
+        2. When replaying, the response comes from the replay archive only
+        3. Else get the page and save it in the record archive when recording
+        """
+        # 1. Non GET requests go straight to the site
+        if method.upper() != "GET":
+            return self.sendRequest(method, url, *args, **kwargs)
+
+        # 2. When replaying, the response comes from the replay archive only
+        if replayFolder is not None:
+            entry = readHttpCacheEntry(url, folder=replayFolder)
+            recordCache("replay", entry is not None)
+            if entry is None:
+                raise requests.exceptions.ConnectionError(f"{url} is not in the replay archive {replayFolder}")
+            return buildCachedResponse(url, entry, replayFolder)
+
+        # 3. Else get the page and save it in the record archive when recording
+        response = self.getPage(method, url, *args, **kwargs)
+        if recordFolder is not None:
+            saveHttpCacheResponse(url, response, recordFolder)
+        return response
+
+    def getPage(self, method, url, *args, **kwargs):
+        """
+        1. Serve the response from the http cache if it is fresh, or if we are offline
+        2. Download the page, revalidating the cached copy with ETag/Last-Modified when there is one
+            Only one thread (or batch worker process) downloads a page at a time, the others then find it in the
+            http cache
+        3. Save successful responses in the http cache
+        """
+        # 1. Serve the response from the http cache if it is fresh, or if we are offline
+        entry = readHttpCacheEntry(url)
+        if offlineMode:
+            recordCache("http", entry is not None)
+            if entry is None:
+                raise requests.exceptions.ConnectionError(f"{url} is not in the http cache (offline mode)")
+            return buildCachedResponse(url, entry)
+        if entry is not None and isHttpCacheFresh(url, entry):
+            recordCache("http", True)
+            return buildCachedResponse(url, entry)
+
+        # 2. Download the page, revalidating the cached copy with ETag/Last-Modified when there is one
+        with fileLock("http-" + getHttpCacheEntryName(url)[:-len(".json")], across_processes=batchWorker):
+            return self.downloadPage(method, url, *args, **kwargs)
+
+    def downloadPage(self, method, url, *args, **kwargs):
+        """
+        1. Use the http cache if the page was downloaded while waiting for the lock
+        2. Download the page, revalidating the cached copy with ETag/Last-Modified when there is one
+            (a 304 counts as a cache hit, the body comes from the cache)
+        3. Save successful responses in the http cache
+        """
+        # 1. Use the http cache if the page was downloaded while waiting for the lock
+        entry = readHttpCacheEntry(url, check_disk=True)
+        if entry is not None and isHttpCacheFresh(url, entry):
+            recordCache("http", True)
+            return buildCachedResponse(url, entry)
+
+        # 2. Download the page, revalidating the cached copy with ETag/Last-Modified when there is one
+        if entry is not None:
+            headers = dict(kwargs.get("headers") or {})
+            if entry["HEADERS"].get("ETag"):
+                headers["If-None-Match"] = entry["HEADERS"]["ETag"]
+            if entry["HEADERS"].get("Last-Modified"):
+                headers["If-Modified-Since"] = entry["HEADERS"]["Last-Modified"]
+            kwargs["headers"] = headers
+
+        response = self.sendRequest(method, url, *args, **kwargs)
+        recordCache("http", response.status_code == 304 and entry is not None)
+        if response.status_code == 304 and entry is not None:
+            entry["FETCHED_AT"] = time.time()
+            writeHttpCacheEntry(url, entry)
+            return buildCachedResponse(url, entry)
+
+        # 3. Save successful responses in the http cache
+        if response.status_code == 200:
+            saveHttpCacheResponse(url, response)
+        return response
+
+    def sendRequest(self, method, url, *args, **kwargs):
+        """
+        Wait for the host's token bucket and send the request, recording its latency & size in the metrics.
+        Hosts of hostOverrides are sent to their stand-in
+        """
+        host = urlparse(url).hostname
+        if host in hostOverrides:
+            url = urlparse(url)._replace(scheme="http", netloc=hostOverrides[host]).geturl()
+            kwargs["headers"] = dict(kwargs.get("headers") or {}, Host=host)
+        self.getBucket(host).acquire()
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            recordHttpRequest(host, time.perf_counter() - start, None)
+            raise
+        recordHttpRequest(host, time.perf_counter() - start, response)
+        return response
+
+
+def getHttpCacheTtl(url) -> int:
+    """
+    Seconds a cached response of this url stays fresh
+    :param url: str
+    :return: int
+    """
+    for url_part, ttl in httpCacheTtl:
+        if url_part in url:
+            return ttl
+    return defaultHttpCacheTtl
+
+
+def isHttpCacheFresh(url, entry) -> bool:
+    """
+    Cached response younger than the ttl of its url. When refreshing, the player pages cached before the run started
+    are stale (they are revalidated, a 304 keeps the cached body)
+    :param url: str
+    :param entry: dict --> http cache entry
+    :return: bool
+    """
+    if refreshHistories and entry["FETCHED_AT"] < runStartedAt and any(page in url for page in refreshHttpPages):
+        return False
+    return time.time() - entry["FETCHED_AT"] < getHttpCacheTtl(url)
+
+
+def getHttpCacheEntryName(url) -> str:
+    """
+    Cache entries are keyed by the sha256 of the url
+    :param url: str
+    :return: str
+    """
+    url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return f"{url_hash}.json"
+
+
+def readHttpCacheEntry(url, check_disk=False, folder=None) -> Union[dict, None]:
+    """
+    Read the cache entry of the url, None if the url (or its body) was never cached
+    :param url: str
+    :param check_disk: bool --> also look for files other processes cached after the folders were listed
+    :param folder: str --> defaults to httpCacheFolder, or a record/replay archive
+    :return: dict or None
+    """
+    folder = folder or httpCacheFolder
+    has_file = fileExistsOnDisk if check_disk else fileExists
+    entry_name = getHttpCacheEntryName(url)
+    if not has_file(entry_name, f"{folder}/entries"):
+        return None
+    with open(f"{folder}/entries/{entry_name}") as json_file:
+        entry = json.load(json_file)
+    if not has_file(f"{entry['BODY']}.gz", f"{folder}/bodies"):
+        return None
+    return entry
+
+
+def writeHttpCacheEntry(url, entry, folder=None) -> None:
+    """
+    Save the cache entry of the url
+    :param url: str
+    :param entry: dict
+    :param folder: str --> defaults to httpCacheFolder, or a record/replay archive
+    :return: None
+    """
+    folder = folder or httpCacheFolder
+    entry_name = getHttpCacheEntryName(url)
+    writeJson(entry, f"{folder}/entries/{entry_name}")
+    registerFile(entry_name, f"{folder}/entries")
+    pass
+
+
+def saveHttpCacheResponse(url, response, folder=None) -> None:
+    """
+    1. Store the body gzip compressed under its sha256, so identical pages are stored once
+    2. Store the entry of the url pointing to the body
+    :param url: str
+    :param response: requests.Response
+    :param folder: str --> defaults to httpCacheFolder, or a record/replay archive
+    :return: None
+    """
+    # 1. Store the body gzip compressed under its sha256, so identical pages are stored once
+    folder = folder or httpCacheFolder
+    body = response.content
+    body_hash = hashlib.sha256(body).hexdigest()
+    if not fileExists(f"{body_hash}.gz", f"{folder}/bodies"):
+        with atomicWrite(f"{folder}/bodies/{body_hash}.gz", "wb") as body_file:
+            body_file.write(gzip.compress(body))
+        registerFile(f"{body_hash}.gz", f"{folder}/bodies")
+
+    # 2. Store the entry of the url pointing to the body
+    entry = {
+        "URL": url,
+        "STATUS": response.status_code,
+        "ENCODING": response.encoding,
+        "HEADERS": {key: response.headers[key] for key in ["Content-Type", "ETag", "Last-Modified"]
+                    if key in response.headers},
+        "BODY": body_hash,
+        "FETCHED_AT": time.time()
+    }
+    writeHttpCacheEntry(url, entry, folder)
+    pass
+
+
+def buildCachedResponse(url, entry, folder=None) -> requests.Response:
+    """
+    Rebuild a requests Response from a cache entry, so callers can't tell it apart from a downloaded one
+    :param url: str
+    :param entry: dict
+    :param folder: str --> defaults to httpCacheFolder, or a record/replay archive
+    :return: requests.Response
+    """
+    folder = folder or httpCacheFolder
+    with gzip.open(f"{folder}/bodies/{entry['BODY']}.gz", "rb") as body_file:
+        body = body_file.read()
+
+    response = requests.Response()
+    response.url = url
+    response.status_code = entry["STATUS"]
+    response.encoding = entry["ENCODING"]
+    response.headers = CaseInsensitiveDict(entry["HEADERS"])
+    response._content = body
+    return response
+
+
+def getHttpSession() -> RateLimitedSession:
+    """
+    Create the shared http session on first use, every scraper request goes through it
+    :return: RateLimitedSession
+    """
+    global httpSession
+
+    with httpSessionLock:
+        if httpSession is None:
+            httpSession = RateLimitedSession(httpPoolSize)
+    return httpSession
+
+
+def getMatch(match_id) -> "espncricinfo.match.Match":
+    """
+    espncricinfo Match downloads its json and html with requests.get, point it to the shared http session so
+    those downloads are pooled and rate limited like all the other requests
+    :param match_id: int
+    :return: Match
+    """
+    import espncricinfo.match
+
+    espncricinfo.match.requests = getHttpSession()
+    return espncricinfo.match.Match(match_id)
+
+
+def getMatchDetails(match_id) -> SimpleNamespace:
+    """
+    1. Load the saved details of the match from DataBase/matchDetails
+    2. Else download the match and keep the details the match reports use (players are kept with their known_as &
+    object_id, innings with their runs & wickets)
+    3. Save them once the match is complete, the details of a match in progress still change
+    :param match_id: int
+    :return: SimpleNamespace --> same attribute names as Match
+    """
+    # 1. Load the saved details of the match from DataBase/matchDetails
+    file_name = f"{match_id}.json"
+    folder_path = "DataBase/matchDetails"
+    recordCache("match details", fileExists(file_name, folder_path))
+    if fileExists(file_name, folder_path):
+        with open(f"{folder_path}/{file_name}") as json_file:
+            return SimpleNamespace(**json.load(json_file))
+
+    # 2. Else download the match and keep the details the match reports use
+    match_api = getMatch(match_id)
+    details = {attribute: getattr(match_api, attribute) for attribute in matchDetailsAttributes}
+    for team_players in ["team_1_players", "team_2_players"]:
+        details[team_players] = [{"known_as": player["known_as"], "object_id": player["object_id"]}
+                                 for player in getattr(match_api, team_players)]
+    details["innings"] = [{"runs": innings["runs"], "wickets": innings["wickets"]} for innings in match_api.innings]
+
+    # 3. Save them once the match is complete, the details of a match in progress still change
+    if details["status"] == "complete":
+        writeJson(details, f"{folder_path}/{file_name}")
+        registerFile(file_name, folder_path)
+    return SimpleNamespace(**details)
+
+
+def parsePage(html_text, strainer) -> bs4.BeautifulSoup:
+    """
+    Parse only the tags matched by the strainer, the rest of the page is skipped instead of being built into the
+    soup
+    :param html_text: str
+    :param strainer: dict --> SoupStrainer arguments
+    :return: BeautifulSoup
+    """
+    return bs4.BeautifulSoup(html_text, "lxml", parse_only=bs4.SoupStrainer(**strainer))
 
 
 def getBothSquadIds() -> list:
@@ -43,8 +1096,8 @@ def getBothSquadIds() -> list:
     match_squad_link = matchUrl.replace("live-cricket-score", "match-squads")
 
     # 2. Using BeautifulSoup extract html text and separate player id's from players url
-    html_text = requests.get(match_squad_link, time.sleep(sleepTime)).text
-    soup = BeautifulSoup(html_text, "lxml")
+    html_text = getHttpSession().get(match_squad_link).text
+    soup = parsePage(html_text, squadStrainer)
 
     table_data = soup.find_all("tbody")
     data = table_data[0].find_all('a', href=True)
@@ -72,23 +1125,21 @@ def getSimplifiedPosition(player_primary_role):
     return player_primary_role
 
 
-def getPlayerDetails(player_id) -> None:
+def downloadPlayerDetails(player_id) -> PlayerRecord:
     """
     1. Get Player API link
     2. download player details in json format
     3. extract required details from json file
-    4. Add all the player details on to the global variable squadDetails
     :param player_id: int
-    :return: None
+    :return: PlayerRecord
     """
-    global bothSquadDetails, totalPlayers
-    print(f"{totalPlayers} players to download, Current player ID: {player_id}")
+    global totalPlayers
 
     # 1. Get Player API link
     player_api = f"http://core.espnuk.org/v2/sports/cricket/athletes/{player_id}"
 
     # 2. download player details in json format
-    player_details = requests.get(player_api, time.sleep(sleepTime))
+    player_details = getHttpSession().get(player_api)
     player_details = player_details.json()
 
     # 3A. extract required details from json file
@@ -115,9 +1166,61 @@ def getPlayerDetails(player_id) -> None:
         else:
             details["BALL_STYLE"] = style["description"]
 
-    # 4. Add all the player details on to the global variable squadDetails
-    bothSquadDetails[player_id] = details
-    totalPlayers -= 1
+    getPlayerIdentities().add(details["ID"], name=details["NAME"])
+    with progressLock:
+        totalPlayers -= 1
+        print(f"{totalPlayers} players to download, Downloaded player ID: {player_id}")
+    return PlayerRecord.fromDetails(details)
+
+
+def getPlayerDetails(player_id) -> None:
+    """
+    1. Download player details
+    2. Add all the player details on to the global variable squadDetails
+    :param player_id: int
+    :return: None
+    """
+    global bothSquadDetails
+
+    # 1. Download player details
+    record = downloadPlayerDetails(player_id)
+
+    # 2. Add all the player details on to the global variable squadDetails
+    bothSquadDetails.add(record)
+    pass
+
+
+def getPlayerIdentities() -> PlayerIdentityIndex:
+    """
+    Load the player identity index once from DataBase/playerIdentities.json
+    :return: PlayerIdentityIndex
+    """
+    global playerIdentities
+
+    with playerIdentitiesLock:
+        if playerIdentities is None:
+            playerIdentities = PlayerIdentityIndex()
+            if os.path.isfile(playerIdentitiesPath):
+                with open(playerIdentitiesPath) as json_file:
+                    playerIdentities.addJson(json.load(json_file))
+                playerIdentities.changed = False
+    return playerIdentities
+
+
+def savePlayerIdentities() -> None:
+    """
+    Save the player identity index if players or names were added, keeping the ones other processes saved meanwhile
+    :return: None
+    """
+    identities = getPlayerIdentities()
+    if not identities.changed:
+        return
+    with fileLock("playerIdentities"):
+        if os.path.isfile(playerIdentitiesPath):
+            with open(playerIdentitiesPath) as json_file:
+                identities.addJson(json.load(json_file))
+        identities.changed = False
+        writeJson(identities.toJson(), playerIdentitiesPath)
     pass
 
 
@@ -131,23 +1234,75 @@ def getMatchId(match_url) -> int:
     return ids[len(ids) - 1]
 
 
+def getDirectoryManifest(folder_path) -> set:
+    """
+    List the folder once and keep the file names in directoryManifest, files written or deleted by this process
+    afterwards are kept up to date with registerFile & unregisterFile
+    :param folder_path: String --> Destination File
+    :return: set --> file names in the folder
+    """
+    with directoryManifestLock:
+        if folder_path not in directoryManifest:
+            directoryManifest[folder_path] = set(os.listdir(folder_path))
+        return directoryManifest[folder_path]
+
+
+def registerFile(file_name, folder_path) -> None:
+    """
+    Add a newly written file to the folder manifest
+    :param file_name: String --> File name
+    :param folder_path: String --> Destination File
+    :return: None
+    """
+    with directoryManifestLock:
+        if folder_path in directoryManifest:
+            directoryManifest[folder_path].add(file_name)
+    pass
+
+
+def unregisterFile(file_name, folder_path) -> None:
+    """
+    Remove a deleted file from the folder manifest
+    :param file_name: String --> File name
+    :param folder_path: String --> Destination File
+    :return: None
+    """
+    with directoryManifestLock:
+        if folder_path in directoryManifest:
+            directoryManifest[folder_path].discard(file_name)
+    pass
+
+
 def fileExists(file_name, folder_path) -> bool:
     """
-    1. Checks if the file exists in the folder
+    1. Checks if the file exists in the folder manifest
     :param file_name: String --> File name
     :param folder_path: String --> Destination File
     :return: Boolean --> If it exists or not
     """
-    all_squad_files = os.listdir(folder_path)
-    if file_name in all_squad_files:
+    return file_name in getDirectoryManifest(folder_path)
+
+
+def fileExistsOnDisk(file_name, folder_path) -> bool:
+    """
+    Checks the folder itself for files another process wrote after the folder manifest was listed, a file found
+    is added to the manifest
+    :param file_name: String --> File name
+    :param folder_path: String --> Destination File
+    :return: Boolean --> If it exists or not
+    """
+    if fileExists(file_name, folder_path):
         return True
-    return False
+    if not os.path.isfile(f"{folder_path}/{file_name}"):
+        return False
+    registerFile(file_name, folder_path)
+    return True
 
 
 def getBothSquadDetails() -> None:
     """
     1. Extract both squad ids
-    2. Extract each player details from their ids and add them to the global variable squadDetails
+    2. Download each player details concurrently and add them to the global variable squadDetails
     3. Save the squad details into a json file
 
     :return:None
@@ -161,20 +1316,27 @@ def getBothSquadDetails() -> None:
     file_path = folder_path + "/" + file_name
     if fileExists(file_name, folder_path):
         with open(file_path) as json_file:
-            bothSquadDetails = json.load(json_file)
+            bothSquadDetails = PlayerRegistry.fromDetails(json.load(json_file))
+        for record in bothSquadDetails:
+            getPlayerIdentities().add(record.id, name=record.name)
+        savePlayerIdentities()
         return None
 
     # 1. Extract both squad ids
     both_squad_ids = getBothSquadIds()
     totalPlayers = len(both_squad_ids)
 
-    # 2. Extract each player details from their ids and add them to the global variable squadDetails
-    for player_id in both_squad_ids:
-        getPlayerDetails(player_id)
+    # 2. Download player details concurrently (at most squadDownloadWorkers at a time) and add them to the global
+    # variable squadDetails in squad order
+    with ThreadPoolExecutor(max_workers=squadDownloadWorkers) as executor:
+        all_player_records = list(executor.map(downloadPlayerDetails, both_squad_ids))
+    for record in all_player_records:
+        bothSquadDetails.add(record)
 
     # 3. Save the squad details into a json file
-    with open(file_path, 'w') as json_file:
-        json.dump(bothSquadDetails, json_file)
+    writeJson(bothSquadDetails.toDetails(), file_path)
+    registerFile(file_name, folder_path)
+    savePlayerIdentities()
 
     pass
 
@@ -188,8 +1350,8 @@ def getPlayerMatchUrl(player_url) -> None or str:
     :return: link or string
     """
     # 1. Extract tab widgets from url
-    html_text = requests.get(player_url, time.sleep(sleepTime)).text
-    soup = BeautifulSoup(html_text, "lxml")
+    html_text = getHttpSession().get(player_url).text
+    soup = parsePage(html_text, tabWidgetsStrainer)
     tab_widgets = soup.find_all("a", class_="ds-h-10")
 
     # 2. check if the matches' page exists
@@ -197,8 +1359,8 @@ def getPlayerMatchUrl(player_url) -> None or str:
         return None
 
     # 3. if exists then extract the url
-    for i in range(len(tab_widgets)):
-        page_url = soup.find_all("a", class_="ds-h-10")[i]['href']
+    for tab_widget in tab_widgets:
+        page_url = tab_widget['href']
         if "matches" in page_url:
             return "https://www.espncricinfo.com" + page_url
 
@@ -260,7 +1422,6 @@ def getMatchTotalRunsAndWickets(match_api):
     """
 
     # Check if the match has a result
-    time.sleep(sleepTime)
     result = match_api.result
     if result == "No result":
         return 0, 0
@@ -274,53 +1435,329 @@ def getMatchTotalRunsAndWickets(match_api):
     return match_runs, match_wickets
 
 
-def downloadRecentMatchRecords(player_matches_url, player_id) -> None:
-    """
-    1. Check if the player recent match records are downloaded
-    2. Check if player_matches_url exists or not
-    3. Extract recent records' table from player_matches_url
-        3.1 get HTML text
-        3.2 create DataFrame column
-            3.2A get table Header and create empty table body dictionary with headers as keys and empty list as values
-            3.2B Get match ids for generating additional info and update table_body
-        3.3 extract values and add them to table_body
-            3.3A Cleaning batting figure
-            3.3B Cleaning bowling figure
-            3.3C Extracting Match ID
-            3.3D remaining all details
-        3.4 Additional Details like ["MATCH_CLASS", "TOTAL_RUNS", "TOTAL_WICKETS"]
-            3.4A Extract Match Class
-            3.4B Extract Total Runs & Wickets
-    4 Convert Dict into DataFrame and then save it in CSV format
-    :param player_matches_url:
-    :param player_id:
-    :return: None
+def getMatchSummary(match_id) -> dict:
+    """
+    1. Look the match up in the in memory LRU cache
+    2. Else load its saved summary from DataBase/matchSummaries
+    3. Else download the match and save its summary, unless another thread or process saved it meanwhile
+    4. Keep the summary in the LRU cache, dropping the least recently used match when the cache is full
+    :param match_id: int
+    :return: dict --> MATCH_CLASS, TOTAL_RUNS, TOTAL_WICKETS, RESULT
+    """
+    match_id = str(match_id)
+
+    # 1. Look the match up in the in memory LRU cache
+    with matchSummariesLock:
+        if match_id in matchSummaries:
+            matchSummaries.move_to_end(match_id)
+            recordCache("match summaries", True)
+            return matchSummaries[match_id]
+
+    # 2. Else load its saved summary from DataBase/matchSummaries
+    file_name = f"{match_id}.json"
+    folder_path = "DataBase/matchSummaries"
+    file_path = folder_path + "/" + file_name
+    if fileExists(file_name, folder_path):
+        recordCache("match summaries", True)
+        with open(file_path) as json_file:
+            summary = json.load(json_file)
+
+    # 3. Else download the match and save its summary, unless another thread or process saved it meanwhile
+    else:
+        with fileLock(f"matchSummary-{match_id}", across_processes=batchWorker):
+            recordCache("match summaries", fileExistsOnDisk(file_name, folder_path))
+            if fileExistsOnDisk(file_name, folder_path):
+                with open(file_path) as json_file:
+                    summary = json.load(json_file)
+            else:
+                match_api = getMatch(match_id)
+                total_runs, total_wickets = getMatchTotalRunsAndWickets(match_api)
+                summary = {
+                    "MATCH_CLASS": getMatchClass(match_api),
+                    "TOTAL_RUNS": total_runs,
+                    "TOTAL_WICKETS": total_wickets,
+                    "RESULT": match_api.result
+                }
+                writeJson(summary, file_path)
+                registerFile(file_name, folder_path)
+
+    # 4. Keep the summary in the LRU cache, dropping the least recently used match when the cache is full
+    with matchSummariesLock:
+        matchSummaries[match_id] = summary
+        matchSummaries.move_to_end(match_id)
+        while len(matchSummaries) > matchSummariesSize:
+            matchSummaries.popitem(last=False)
+    return summary
+
+
+def getPlayerHistoryConnection() -> sqlite3.Connection:
+    """
+    Open the player history store, creating its tables on first use
+    player_histories --> one row per downloaded player history (columns of the table & when it was refreshed)
+    match_records --> one row per match of a player history, full row kept as json in record
+    :return: sqlite3.Connection
+    """
+    global playerHistoryReady
+
+    connection = sqlite3.connect(playerHistoryPath, timeout=30)
+    if not playerHistoryReady:
+        with connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS player_histories (
+                    history TEXT NOT NULL,
+                    player_id INTEGER NOT NULL,
+                    columns TEXT NOT NULL,
+                    refreshed_at REAL NOT NULL,
+                    PRIMARY KEY (history, player_id)
+                );
+                CREATE TABLE IF NOT EXISTS match_records (
+                    history TEXT NOT NULL,
+                    player_id INTEGER NOT NULL,
+                    row_number INTEGER NOT NULL,
+                    match_id INTEGER,
+                    match_class TEXT,
+                    performance REAL,
+                    record TEXT NOT NULL,
+                    PRIMARY KEY (history, player_id, row_number)
+                );
+                CREATE INDEX IF NOT EXISTS match_records_player_match ON match_records (player_id, match_id);
+                CREATE INDEX IF NOT EXISTS match_records_match_class ON match_records (history, match_class);
+            """)
+        playerHistoryReady = True
+    return connection
+
+
+def playerHistoryExists(history, player_id) -> bool:
+    """
+    Checks if the player history is already downloaded
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :param player_id: int
+    :return: bool
+    """
+    with closing(getPlayerHistoryConnection()) as connection:
+        row = connection.execute("SELECT 1 FROM player_histories WHERE history = ? AND player_id = ?",
+                                 (history, int(player_id))).fetchone()
+    return row is not None
+
+
+def savePlayerHistory(history, player_id, history_df) -> None:
+    """
+    1. Convert DataFrame rows into json friendly values
+    2. Replace the stored player history with the DataFrame
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :param player_id: int
+    :param history_df: DataFrame
+    :return: None
+    """
+    # 1. Convert DataFrame rows into json friendly values
+    columns = history_df.columns.tolist()
+    rows = json.loads(history_df.to_json(orient="values"))
+    match_records = []
+    for row_number, row in enumerate(rows):
+        record = dict(zip(columns, row))
+        match_id = record.get("MATCH_ID")
+        if match_id is not None:
+            match_id = int(match_id)
+        match_records.append((history, int(player_id), row_number, match_id, record.get("MATCH_CLASS"),
+                              record.get("PERFORMANCE"), json.dumps(row)))
+
+    # 2. Replace the stored player history with the DataFrame
+    with closing(getPlayerHistoryConnection()) as connection, connection:
+        connection.execute("DELETE FROM match_records WHERE history = ? AND player_id = ?", (history, int(player_id)))
+        connection.execute("INSERT OR REPLACE INTO player_histories VALUES (?, ?, ?, ?)",
+                           (history, int(player_id), json.dumps(columns), time.time()))
+        connection.executemany("INSERT INTO match_records VALUES (?, ?, ?, ?, ?, ?, ?)", match_records)
+    recordRows(history, len(match_records))
+    pass
+
+
+def loadPlayerHistory(history, player_id) -> Union[pd.DataFrame, None]:
+    """
+    Load the player history as DataFrame, None if it's not downloaded
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :param player_id: int
+    :return: DataFrame or None
+    """
+    with closing(getPlayerHistoryConnection()) as connection:
+        row = connection.execute("SELECT columns FROM player_histories WHERE history = ? AND player_id = ?",
+                                 (history, int(player_id))).fetchone()
+        if row is None:
+            return None
+        records = connection.execute(
+            "SELECT record FROM match_records WHERE history = ? AND player_id = ? ORDER BY row_number",
+            (history, int(player_id))).fetchall()
+    return pd.DataFrame([json.loads(record) for record, in records], columns=json.loads(row[0]))
+
+
+def deletePlayerHistory(history, player_id) -> None:
+    """
+    Remove the player history from the store
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :param player_id: int
+    :return: None
+    """
+    with closing(getPlayerHistoryConnection()) as connection, connection:
+        connection.execute("DELETE FROM match_records WHERE history = ? AND player_id = ?", (history, int(player_id)))
+        connection.execute("DELETE FROM player_histories WHERE history = ? AND player_id = ?",
+                           (history, int(player_id)))
+    pass
+
+
+def getStoredMatchIds(history, player_id) -> set:
+    """
+    Match ids already stored in the player history
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :param player_id: int
+    :return: set --> match ids as str
+    """
+    with closing(getPlayerHistoryConnection()) as connection:
+        rows = connection.execute("SELECT match_id FROM match_records WHERE history = ? AND player_id = ?",
+                                  (history, int(player_id))).fetchall()
+    return {str(match_id) for match_id, in rows if match_id is not None}
+
+
+def getNewMatchIds(history, player_id, match_ids) -> list:
+    """
+    Match ids that aren't stored in the player history yet, all of them when the history isn't downloaded
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :param player_id: int
+    :param match_ids: list
+    :return: list
+    """
+    stored_match_ids = getStoredMatchIds(history, player_id)
+    return [match_id for match_id in match_ids if str(match_id) not in stored_match_ids]
+
+
+def addNewMatchRecords(history, player_id, new_records_df, window_match_ids) -> pd.DataFrame:
+    """
+    Put the new match records on top of the stored player history (newest first, like the scraped tables). Stored
+    matches that dropped out of the scraped window (older than the recent matches table or intPeriod) are left out,
+    so the forms keep averaging the same window a fresh download would
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :param player_id: int
+    :param new_records_df: DataFrame
+    :param window_match_ids: list --> match ids of the scraped table
+    :return: DataFrame
+    """
+    stored_records_df = loadPlayerHistory(history, player_id)
+    if stored_records_df is None:
+        return new_records_df
+    if "MATCH_ID" in stored_records_df:
+        window_match_ids = {str(match_id) for match_id in window_match_ids}
+        stored_records_df = stored_records_df[stored_records_df["MATCH_ID"].astype(str).isin(window_match_ids)]
+    print(f"{len(new_records_df)} new {history} for {player_id}, {len(stored_records_df)} already stored")
+    return pd.concat([new_records_df, stored_records_df], ignore_index=True)
+
+
+def migratePlayerHistoryCsv() -> None:
+    """
+    Copy the per player csv files of DataBase/recentMatchRecords & DataBase/internationalMatchRecords into the
+    player history store. Players already in the store are skipped, the csv files are left untouched.
+    :return: None
+    """
+    for history in ["recentMatchRecords", "internationalMatchRecords"]:
+        folder_path = f"DataBase/{history}"
+        if not os.path.isdir(folder_path):
+            continue
+
+        migrated = 0
+        for file_name in os.listdir(folder_path):
+            if not file_name.endswith(".csv"):
+                continue
+            player_id = file_name[:-len(".csv")]
+            if playerHistoryExists(history, player_id):
+                continue
+            try:
+                history_df = pd.read_csv(f"{folder_path}/{file_name}")
+            except pd.errors.EmptyDataError:
+                history_df = pd.DataFrame()
+            savePlayerHistory(history, player_id, history_df)
+            migrated += 1
+        print(f"{migrated} {history} csv files migrated to {playerHistoryPath}")
+    pass
+
+
+def calculatePerformance(records_df, history) -> pd.Series:
     """
-    global pagesLeft
+    PERFORMANCE of every match in one column operation:
+    (runs + wickets * wicketPoints) / (match runs + match wickets * wicketPoints) * 100,
+    0 when the player or the match has no points
+    :param records_df: DataFrame --> match records with runs, wickets, TOTAL_RUNS & TOTAL_WICKETS columns
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :return: Series
+    """
+    runs_column, wickets_column = performanceColumns[history]
+    no_points = pd.Series(0, index=records_df.index)
+    runs = records_df[runs_column].fillna(0) if runs_column in records_df else no_points
+    wickets = records_df[wickets_column].fillna(0) if wickets_column in records_df else no_points
 
-    # 1. Check if the player recent match records are downloaded
-    file_name = str(player_id) + ".csv"
-    folder_path = "DataBase/recentMatchRecords"
-    file_path = folder_path + "/" + file_name
-    if fileExists(file_name, folder_path):
-        pagesLeft -= 10
+    player_points = runs.astype(int) + (wickets.astype(int) * wicketPoints)
+    match_points = records_df["TOTAL_RUNS"].astype(int) + (records_df["TOTAL_WICKETS"].astype(int) * wicketPoints)
 
-        print(f"{file_name} exists & {pagesLeft} pages to download in recent match records")
-        return
+    performance = (player_points / match_points) * 100
+    performance = performance.where((player_points != 0) & (match_points != 0), 0)
+    return performance.round(3)
 
-    # 2. Check if player_matches_url exists or not
-    if player_matches_url is None:
-        pagesLeft -= 10
-        print(f" matches page doesn't exists for {player_id} & {pagesLeft} pages to download in recent match records")
-        return
 
-    # 3. Extract recent records' table from player_matches_url
-    # 3.1 get HTML text
-    html_text = requests.get(player_matches_url, time.sleep(sleepTime)).text
-    soup = BeautifulSoup(html_text, "lxml")
+def recomputePerformance() -> None:
+    """
+    1. Load every stored match record of a history as one DataFrame
+    2. Recalculate the PERFORMANCE column of all of them at once
+    3. Write the new performance back to the store
+    :return: None
+    """
+    with closing(getPlayerHistoryConnection()) as connection, connection:
+        for history in performanceColumns:
+            # 1. Load every stored match record of a history as one DataFrame
+            columns = dict(connection.execute("SELECT player_id, columns FROM player_histories WHERE history = ?",
+                                              (history,)).fetchall())
+            stored = connection.execute(
+                "SELECT player_id, row_number, record FROM match_records WHERE history = ?", (history,)).fetchall()
+            keys = []
+            records = []
+            for player_id, row_number, record in stored:
+                keys.append((player_id, row_number))
+                records.append(dict(zip(json.loads(columns[player_id]), json.loads(record))))
+            if len(records) == 0:
+                continue
+            records_df = pd.DataFrame(records)
+
+            # 2. Recalculate the PERFORMANCE column of all of them at once
+            records_df["PERFORMANCE"] = calculatePerformance(records_df, history)
+
+            # 3. Write the new performance back to the store
+            updates = []
+            for (player_id, row_number), record, performance in zip(keys, records, records_df["PERFORMANCE"]):
+                record["PERFORMANCE"] = float(performance)
+                row = [record[column] for column in json.loads(columns[player_id])]
+                updates.append((float(performance), json.dumps(row), history, player_id, row_number))
+            connection.executemany(
+                "UPDATE match_records SET performance = ?, record = ? "
+                "WHERE history = ? AND player_id = ? AND row_number = ?", updates)
+            print(f"PERFORMANCE recalculated for {len(updates)} {history}")
+    pass
+
+
+def getRecentMatchTable(player_matches_url) -> tuple:
+    """
+    1. get HTML text
+    2. create DataFrame column
+        2A get table Header and create empty table body dictionary with headers as keys and empty list as values
+        2B Keep the match ids for downloading the match summaries
+    3. extract values and add them to table_body
+        3A Cleaning batting figure
+        3B Cleaning bowling figure
+        3C Extracting Match ID
+        3D remaining all details
+    :param player_matches_url: str
+    :return: dict, list --> table body and the match ids in it
+    """
+    # 1. get HTML text
+    html_text = getHttpSession().get(player_matches_url).text
+    soup = parsePage(html_text, recentMatchesStrainer)
 
-    # 3.2 create DataFrame column
-    # 3.2A get table Header and create empty table body dictionary with headers as keys and empty list as values
+    # 2. create DataFrame column
+    # 2A get table Header and create empty table body dictionary with headers as keys and empty list as values
     table_body = {}
     table_headers = soup.find_all("th")
     df_columns = []
@@ -333,12 +1770,10 @@ def downloadRecentMatchRecords(player_matches_url, player_id) -> None:
             df_columns.append(header)
             table_body[header] = []
 
-    # 3.2B Get match ids for generating additional info and update table_body
+    # 2B Keep the match ids for downloading the match summaries
     recent_matches_ids = []
-    additional_info = {"MATCH_CLASS": [], "TOTAL_RUNS": [], "TOTAL_WICKETS": [], "PERFORMANCE": []}
-    table_body.update(additional_info)
 
-    # 3.3 extract values and add them to table_body
+    # 3. extract values and add them to table_body
     table_body_data = soup.find_all("td")
     num_table_cols = len(df_columns)
     for index in range(len(table_body_data)):
@@ -369,144 +1804,207 @@ def downloadRecentMatchRecords(player_matches_url, player_id) -> None:
         else:
             table_body[df_columns[cols_index]].append(table_body_data[index].text)
 
-    # 3.4 Additional Details like ["MATCH_CLASS", "TOTAL_RUNS", "TOTAL_WICKETS"]
+    return table_body, recent_matches_ids
 
-    for match_id in recent_matches_ids:
-        print(f"{pagesLeft} pages to download in recent match records, Current player id: {player_id}")
-
-        time.sleep(sleepTime)
-        match_api = Match(match_id)
 
-        # 3.4A Extract Match Class
-        match_class = getMatchClass(match_api)
-        table_body["MATCH_CLASS"].append(match_class)
+def saveRecentMatchRecords(player_id, table_body) -> None:
+    """
+    1. Convert Dict into DataFrame
+    2. Leave out the matches already stored for the player, only new matches need their details
+    3. Additional Details like ["MATCH_CLASS", "TOTAL_RUNS", "TOTAL_WICKETS"] and performance
+        3A Extract Match Class
+        3B Extract Total Runs & Wickets
+    4. Add the new matches to the stored ones and save it in the player history store
+    :param player_id: int
+    :param table_body: dict
+    :return: None
+    """
+    global pagesLeft
 
-        # 3.4B Extract Total Runs & Wickets
-        total_runs, total_wickets = getMatchTotalRunsAndWickets(match_api)
-        table_body["TOTAL_RUNS"].append(total_runs)
-        table_body["TOTAL_WICKETS"].append(total_wickets)
+    # 1. Convert Dict into DataFrame
+    recent_records_df = pd.DataFrame()
+    for column in table_body:
+        recent_records_df[column] = table_body[column]
 
-        pagesLeft -= 1
+    # 2. Leave out the matches already stored for the player, only new matches need their details
+    new_matches_ids = getNewMatchIds("recentMatchRecords", player_id, table_body.get("MATCH_ID", []))
+    if "MATCH_ID" in recent_records_df:
+        recent_records_df = recent_records_df[recent_records_df["MATCH_ID"].isin(new_matches_ids)]
+        recent_records_df = recent_records_df.reset_index(drop=True)
 
-    # Performance
-    for i in range(len(table_body["TOTAL_WICKETS"])):
-        runs = 0
-        wickets = 0
-        if "BAT" in table_body:
-            runs = table_body["BAT"][i]
-        if "BOWL" in table_body:
-            wickets = table_body["BOWL"][i]
-        match_runs = table_body["TOTAL_RUNS"][i]
-        match_wickets = table_body["TOTAL_WICKETS"][i]
+    # 3. Additional Details like ["MATCH_CLASS", "TOTAL_RUNS", "TOTAL_WICKETS"] and performance
+    additional_info = {"MATCH_CLASS": [], "TOTAL_RUNS": [], "TOTAL_WICKETS": []}
+    for match_id in new_matches_ids:
+        print(f"{pagesLeft} pages to download in recent match records, Current player id: {player_id}")
 
-        player_points = int(runs) + (int(wickets) * 25)
-        match_points = int(match_runs) + (int(match_wickets) * 25)
+        match_summary = getMatchSummary(match_id)
 
-        performance = 0
-        if (player_points != 0) and (match_points != 0):
-            performance = (player_points / match_points) * 100
+        # 3A Extract Match Class
+        additional_info["MATCH_CLASS"].append(match_summary["MATCH_CLASS"])
 
-        table_body["PERFORMANCE"].append(round(performance, 3))
+        # 3B Extract Total Runs & Wickets
+        additional_info["TOTAL_RUNS"].append(match_summary["TOTAL_RUNS"])
+        additional_info["TOTAL_WICKETS"].append(match_summary["TOTAL_WICKETS"])
 
-    # 4 Convert Dict into DataFrame and then save it in CSV format
-    recent_records_df = pd.DataFrame()
-    for column in table_body:
-        recent_records_df[column] = table_body[column]
-    recent_records_df.to_csv(file_path, index=False)
+        pagesLeft -= 1
+    for column in additional_info:
+        recent_records_df[column] = additional_info[column]
+    recent_records_df["PERFORMANCE"] = calculatePerformance(recent_records_df, "recentMatchRecords")
+
+    # 4. Add the new matches to the stored ones and save it in the player history store
+    recent_records_df = addNewMatchRecords("recentMatchRecords", player_id, recent_records_df,
+                                           table_body.get("MATCH_ID", []))
+    savePlayerHistory("recentMatchRecords", player_id, recent_records_df)
     pass
 
 
-def getRecentMatchRecords() -> None:
+def getRecentMatchTables() -> dict:
     """
-    For each player id extract players match url and download there recent match records
-    :return: None
+    For each player id whose recent match records aren't downloaded (every player when refreshing), extract players
+    match url and scrape the recent matches table
+    :return: dict --> player id: (table body, match ids)
     """
     global bothSquadDetails, pagesLeft
-    pagesLeft = len(bothSquadDetails) * 10
 
-    for player_id in bothSquadDetails:
+    recent_match_tables = {}
+    for player_id in bothSquadDetails.ids():
 
         # 1. Check if the player recent match records are downloaded
-        file_name = str(player_id) + ".csv"
-        folder_path = "DataBase/recentMatchRecords"
-        if fileExists(file_name, folder_path):
+        is_downloaded = playerHistoryExists("recentMatchRecords", player_id)
+        recordCache("recentMatchRecords", is_downloaded)
+        if (is_downloaded and not refreshHistories) or isJournaled("recentMatchRecords", player_id):
             pagesLeft -= 10
             print(
                 f"for {player_id} recent matches records are already downloaded & {pagesLeft} pages to download in recent match records")
-        else:
-            player_matches_url = getPlayerMatchUrl(bothSquadDetails[player_id]["URL"])
-            try:
-                downloadRecentMatchRecords(player_matches_url, player_id)
-            except Exception as e:
-                print(f"Error occurred while downloading recent matches of {player_id} player, Error: {e}")
+            addToRunJournal("recentMatchRecords", player_id)
+            continue
+
+        try:
+            player_matches_url = getPlayerMatchUrl(bothSquadDetails.get(player_id).url)
+            if player_matches_url is None:
+                pagesLeft -= 10
+                print(f" matches page doesn't exists for {player_id} & {pagesLeft} pages to download in recent match records")
+                addToRunJournal("recentMatchRecords", player_id)
+                continue
+            recent_match_tables[player_id] = getRecentMatchTable(player_matches_url)
+        except Exception as e:
+            print(f"Error occurred while downloading recent matches of {player_id} player, Error: {e}")
+    return recent_match_tables
+
+
+def saveRecentMatchTables(recent_match_tables) -> None:
+    """
+    Save the scraped recent matches table of each player
+    :param recent_match_tables: dict --> player id: (table body, match ids)
+    :return: None
+    """
+    for player_id in recent_match_tables:
+        table_body, recent_matches_ids = recent_match_tables[player_id]
+        try:
+            saveRecentMatchRecords(player_id, table_body)
+            addToRunJournal("recentMatchRecords", player_id)
+        except Exception as e:
+            print(f"Error occurred while downloading recent matches of {player_id} player, Error: {e}")
     pass
 
 
-def getInternationalRecordsLink(player_id) -> str:
+def getInternationalRecordsPage(player_id) -> bs4.BeautifulSoup:
     """
-    check if international records are available
+    1. Use the records page decided before for this player while the decision is fresh
+    2. Else parse the test/odi/t20i records page, if it has no records table fall back to the youth odi page
+    3. Remember which page holds the player's records in DataBase/internationalRecordsLinks.json
+    Each page is downloaded and parsed at most once
     :param player_id: int
-    :return: str
+    :return: BeautifulSoup --> parsed records page
     """
     test_odi_t20i_records_link = f"https://stats.espncricinfo.com/ci/engine/player/{player_id}.html?class=11;template=results;type=allround;view=match"
     youth_odi_link = f"https://stats.espncricinfo.com/ci/engine/player/{player_id}.html?class=21;template=results;type=allround;view=match"
 
-    html_text = requests.get(test_odi_t20i_records_link, time.sleep(sleepTime)).text
-    soup = BeautifulSoup(html_text, "lxml")
-
-    # 2. Check if the records' table is available if not return youth odi link
-    table_header = soup.find_all("tr", class_="headlinks")
-    if len(table_header) == 0:
-        return youth_odi_link
-
-    return test_odi_t20i_records_link
-
-
-def getInternationalRecordsDict(records_link) -> dict:
-    """
-    1. Extract html text from link
-    2. Check if the records' table is available if not return None
-    3. Extract table html data
-    4. Convert html table into DataFrame
-    4.1 Extract table header
-        4.1A Check if the head is empty
-    4.2 Extract table body
-        4.2A if last column then convert it to match id
-    :param records_link: str
+    # 1. Use the records page decided before for this player while the decision is fresh
+    records_links = getInternationalRecordsLinks()
+    decision = records_links.get(str(player_id))
+    if decision is not None and time.time() - decision["DECIDED_AT"] < getHttpCacheTtl(decision["LINK"]):
+        html_text = getHttpSession().get(decision["LINK"]).text
+        return parsePage(html_text, internationalRecordsStrainer)
+
+    # 2. Else parse the test/odi/t20i records page, if it has no records table fall back to the youth odi page
+    records_link = test_odi_t20i_records_link
+    html_text = getHttpSession().get(records_link).text
+    soup = parsePage(html_text, internationalRecordsStrainer)
+    if len(soup.find_all("tr", class_="headlinks")) == 0:
+        records_link = youth_odi_link
+        html_text = getHttpSession().get(records_link).text
+        soup = parsePage(html_text, internationalRecordsStrainer)
+
+    # 3. Remember which page holds the player's records, keeping the decisions other processes saved meanwhile
+    records_links[str(player_id)] = {"LINK": records_link, "DECIDED_AT": time.time()}
+    with fileLock("internationalRecordsLinks"):
+        if os.path.isfile("DataBase/internationalRecordsLinks.json"):
+            with open("DataBase/internationalRecordsLinks.json") as json_file:
+                saved_records_links = json.load(json_file)
+            for saved_player_id in saved_records_links:
+                records_links.setdefault(saved_player_id, saved_records_links[saved_player_id])
+        writeJson(records_links, "DataBase/internationalRecordsLinks.json")
+    registerFile("internationalRecordsLinks.json", "DataBase")
+    return soup
+
+
+def getInternationalRecordsLinks() -> dict:
+    """
+    Load the records page decisions once from DataBase/internationalRecordsLinks.json
+    :return: dict --> player id: {"LINK": records page link, "DECIDED_AT": time}
+    """
+    global internationalRecordsLinks
+
+    if internationalRecordsLinks is None:
+        internationalRecordsLinks = {}
+        if fileExists("internationalRecordsLinks.json", "DataBase"):
+            with open("DataBase/internationalRecordsLinks.json") as json_file:
+                internationalRecordsLinks = json.load(json_file)
+    return internationalRecordsLinks
+
+
+def getInternationalRecordsDict(soup) -> dict:
+    """
+    1. Check if the records' table is available if not return None
+    2. Extract table html data
+    3. Convert html table into DataFrame
+    3.1 Extract table header
+        3.1A Check if the head is empty
+    3.2 Extract table body
+        3.2A if last column then convert it to match id
+    :param soup: BeautifulSoup --> parsed records page
     :return: Dictionary
     """
     global pagesLeft
-    # 1. Extract html text from link
-    html_text = requests.get(records_link, time.sleep(sleepTime)).text
-    soup = BeautifulSoup(html_text, "lxml")
 
-    # 2. Check if the records' table is available if not return None
+    # 1. Check if the records' table is available if not return None
     table_header = soup.find_all("tr", class_="headlinks")
     if len(table_header) == 0:
         pagesLeft -= 20
         print(f"No international records found, {pagesLeft} pages to download in international Match Records")
         return {}
 
-    # 3. Extract table html data
+    # 2. Extract table html data
     table_data = soup.find_all("table", class_="engineTable")
     table_data = table_data[3]
 
-    # 4. Convert html table into DataFrame
-    # 4.1 Extract table header
+    # 3. Convert html table into DataFrame
+    # 3.1 Extract table header
     head_data = table_data.find_all("th")
     column = []
     table = {}
     count = 1
     for head in head_data:
         header = head.text
-        # 4.1A Check if the head is empty
+        # 3.1A Check if the head is empty
         if header == "":
             header = "empty-" + str(count)
             count += 1
         column.append(header)
         table[header] = []
 
-    # 4.2 Extract table body
+    # 3.2 Extract table body
     table_body_data = table_data.find_all("td")
     num_table_cols = len(column)
     for index in range(len(table_body_data)):
@@ -532,57 +2030,49 @@ def getInternationalRecordsDict(records_link) -> dict:
     return table
 
 
-def getInternationalRecordsTable(player_id) -> None:
-    """
-    1. Check if the player recent match records are downloaded
-    2. Extract international matches records and extract the data
-    3. Create table and download it into a csv file
-        3.1 Create table dictionary format
-        3.2 Go through each row in a sequential order and append the extracted values
-            3.2A Extract runs
-            3.2B Extract wickets
-            3.2C Extract match
-            3.2D Extract year
-            3.2E Extract ground
-            3.2F extract Match ID
-            3.2G Extract Match Class
-            3.2H Extract Match runs and wickets
-            3.2I Calculate performance
-    4. convert dict into DataFrame and then CSV
-    :param player_id:
-    :return:
+def saveInternationalRecordsTable(player_id, records_dict) -> None:
+    """
+    1. Create table and download it into a csv file
+        1.1 Create table dictionary format
+        1.2 Go through each row in a sequential order and append the extracted values
+            1.2A extract Match ID, skip the matches already stored for the player
+            1.2B Extract runs
+            1.2C Extract wickets
+            1.2D Extract match
+            1.2E Extract year
+            1.2F Extract ground
+            1.2G Extract Match Class
+            1.2H Extract Match runs and wickets
+    2. convert dict into DataFrame, calculate performance, add it to the stored matches and save it in the player
+    history store
+    :param player_id: int
+    :param records_dict: dict
+    :return: None
     """
     global pagesLeft, currentYear, intPeriod
 
-    # 1. Check if the player recent match records are downloaded
-    file_name = str(player_id) + ".csv"
-    folder_path = "DataBase/internationalMatchRecords"
-    file_path = folder_path + "/" + file_name
-    if fileExists(file_name, folder_path):
-        pagesLeft -= 20
-        print(
-            f"For {player_id} International records are already downloaded, {pagesLeft} pages to download in international Match Records")
-        return
-
-    # 2. Extract international matches records and extract the data
-    records_link = getInternationalRecordsLink(player_id)
-    records_dict = getInternationalRecordsDict(records_link)
-
-    # 3. Create table and download it into a csv file
-    # 3.1 Create table dictionary format
+    # 1. Create table and download it into a csv file
+    # 1.1 Create table dictionary format
     table = {"MATCH": [], "BAT": [], "BALL": [], "DATE": [], "GROUND": [], "MATCH_ID": [], "MATCH_CLASS": [],
-             "TOTAL_RUNS": [], "TOTAL_WICKETS": [], "PERFORMANCE": []}
+             "TOTAL_RUNS": [], "TOTAL_WICKETS": []}
 
     records_dict_keys_list = []
     for keys in records_dict:
         records_dict_keys_list.append(keys)
+    stored_match_ids = getStoredMatchIds("internationalMatchRecords", player_id)
 
-    # 3.2 Go through each row in a sequential order and append the extracted values
+    # 1.2 Go through each row in a sequential order and append the extracted values
     if len(records_dict) != 0:
         for i in range(len(records_dict["Bat1"])):
             if currentYear - int(records_dict["Start Date"][i]) <= intPeriod:
 
-                # 3.2A Extract runs
+                # 1.2A extract Match ID, skip the matches already stored for the player
+                key_value = records_dict_keys_list[len(records_dict) - 1]
+                match_id = records_dict[key_value][i]
+                if str(match_id) in stored_match_ids:
+                    continue
+
+                # 1.2B Extract runs
                 bat2 = 0
                 bat1 = getRunsSimplified(records_dict["Bat1"][i])
                 if bat1 == "DNB" or bat1 == "-" or bat1 == "TDNB" or bat1 == "sub" or bat1 == "absent":
@@ -594,171 +2084,373 @@ def getInternationalRecordsTable(player_id) -> None:
                 runs = int(bat1) + int(bat2)
                 table["BAT"].append(runs)
 
-                # 3.2B Extract wickets
+                # 1.2C Extract wickets
                 wickets = records_dict["Wkts"][i]
                 if wickets == "-":
                     wickets = 0
                 table["BALL"].append(wickets)
 
-                # 3.2C Extract match
+                # 1.2D Extract match
                 table["MATCH"].append(records_dict["Opposition"][i])
 
-                # 3.2D Extract year
+                # 1.2E Extract year
                 table["DATE"].append(records_dict["Start Date"][i])
 
-                # 3.2E Extract ground
+                # 1.2F Extract ground
                 table["GROUND"].append(records_dict["Ground"][i])
-
-                # 3.2F extract Match ID
-                key_value = records_dict_keys_list[len(records_dict) - 1]
-                match_id = records_dict[key_value][i]
                 table["MATCH_ID"].append(match_id)
 
-                match_api = Match(match_id)
+                match_summary = getMatchSummary(match_id)
 
-                # 3.2G Extract Match Class
-                table["MATCH_CLASS"].append(getMatchClass(match_api))
+                # 1.2G Extract Match Class
+                table["MATCH_CLASS"].append(match_summary["MATCH_CLASS"])
 
-                match_runs, match_wickets = getMatchTotalRunsAndWickets(match_api)
+                match_runs = match_summary["TOTAL_RUNS"]
+                match_wickets = match_summary["TOTAL_WICKETS"]
 
-                # 3.2H Extract Match runs and wickets
+                # 1.2H Extract Match runs and wickets
                 table["TOTAL_RUNS"].append(match_runs)
                 table["TOTAL_WICKETS"].append(match_wickets)
 
-                # 3.2I Calculate performance
-                player_points = int(runs) + (int(wickets) * 25)
-                match_points = int(match_runs) + (int(match_wickets) * 25)
-
-                performance = 0
-                if (player_points != 0) and (match_points != 0):
-                    performance = (player_points / match_points) * 100
-                table["PERFORMANCE"].append(round(performance, 3))
-
                 pagesLeft -= 1
                 print(f"{pagesLeft} pages to download in international Match Records, Current player id: {player_id}")
 
-    # 4. convert dict into DataFrame and then CSV
+    # 2. convert dict into DataFrame, calculate performance, add it to the stored matches and save it in the player
+    # history store
     international_records_df = pd.DataFrame()
     for head in table:
         international_records_df[head] = table[head]
-    international_records_df.to_csv(file_path, index=False)
+    international_records_df["PERFORMANCE"] = calculatePerformance(international_records_df,
+                                                                   "internationalMatchRecords")
+    international_records_df = addNewMatchRecords("internationalMatchRecords", player_id, international_records_df,
+                                                  getInternationalMatchIds(records_dict))
+    savePlayerHistory("internationalMatchRecords", player_id, international_records_df)
 
     pass
 
 
-def getInternationalMatchRecords() -> None:
+def getInternationalMatchIds(records_dict) -> list:
     """
-    Go through each player ID and generate international records table
-    :return: None
+    Match ids of the international records within the international period
+    :param records_dict: dict
+    :return: list
+    """
+    global currentYear, intPeriod
+
+    if len(records_dict) == 0:
+        return []
+
+    match_id_column = list(records_dict.keys())[len(records_dict) - 1]
+    match_ids = []
+    for i in range(len(records_dict["Bat1"])):
+        if currentYear - int(records_dict["Start Date"][i]) <= intPeriod:
+            match_ids.append(records_dict[match_id_column][i])
+    return match_ids
+
+
+def getInternationalRecordsDicts() -> dict:
+    """
+    For each player id whose international records aren't downloaded (every player when refreshing), scrape the
+    international records table
+    :return: dict --> player id: records dict
     """
     global bothSquadDetails, pagesLeft
-    pagesLeft = len(bothSquadDetails) * 20
 
-    for player_id in bothSquadDetails:
-        getInternationalRecordsTable(player_id)
+    international_records_dicts = {}
+    for player_id in bothSquadDetails.ids():
+        is_downloaded = playerHistoryExists("internationalMatchRecords", player_id)
+        recordCache("internationalMatchRecords", is_downloaded)
+        if (is_downloaded and not refreshHistories) or isJournaled("internationalMatchRecords", player_id):
+            pagesLeft -= 20
+            print(
+                f"For {player_id} International records are already downloaded, {pagesLeft} pages to download in international Match Records")
+            addToRunJournal("internationalMatchRecords", player_id)
+            continue
+
+        try:
+            international_records_dicts[player_id] = getInternationalRecordsDict(getInternationalRecordsPage(player_id))
+        except Exception as e:
+            print(f"Error occurred while downloading international records of {player_id} player, Error: {e}")
+    return international_records_dicts
+
+
+def saveInternationalRecordsDicts(international_records_dicts) -> None:
+    """
+    Save the scraped international records of each player
+    :param international_records_dicts: dict --> player id: records dict
+    :return: None
+    """
+    for player_id in international_records_dicts:
+        try:
+            saveInternationalRecordsTable(player_id, international_records_dicts[player_id])
+            addToRunJournal("internationalMatchRecords", player_id)
+        except Exception as e:
+            print(f"Error occurred while downloading international records of {player_id} player, Error: {e}")
     pass
 
 
-def getAllRecentPerformance(player_id) -> Union[int, float]:
+def getRecentTablesMatchIds(recent_match_tables) -> list:
     """
-    1. open the csv file as DataFrame
-    2. calculate average performance in all recent matches
-    :param player_id: int
-    :return: int
+    :param recent_match_tables: dict --> player id: (table body, match ids)
+    :return: list --> match ids of all the tables that aren't stored yet
     """
-    file_name = f"{player_id}.csv"
-    folder_path = "DataBase/recentMatchRecords"
-    if fileExists(file_name, folder_path):
-        recent_matches = pd.read_csv(f"DataBase/recentMatchRecords/{player_id}.csv")
-        total = 0
-        count = 0
-        for index, row in recent_matches.iterrows():
-            total += row["PERFORMANCE"]
-            count += 1
-        if total == 0 or count == 0:
-            return 0
-        return round((total / count), 3)
-    print(f"{player_id} recent performance doesn't exist")
-    return 0
+    match_ids = []
+    for player_id in recent_match_tables:
+        match_ids += getNewMatchIds("recentMatchRecords", player_id, recent_match_tables[player_id][1])
+    return match_ids
 
 
-def getMatchClassRecentPerformance(player_id) -> Union[int, float]:
+def getInternationalTablesMatchIds(international_records_dicts) -> list:
     """
-    1. open the csv file as DataFrame
-    2. calculate average performance in similar match class in  recent matches
-    :param player_id: int
-    :return: int
+    :param international_records_dicts: dict --> player id: records dict
+    :return: list --> match ids of all the records within the international period that aren't stored yet
     """
-    global matchClass
+    match_ids = []
+    for player_id in international_records_dicts:
+        match_ids += getNewMatchIds("internationalMatchRecords", player_id,
+                                    getInternationalMatchIds(international_records_dicts[player_id]))
+    return match_ids
+
+
+def prefetchMatchSummary(match_id) -> None:
+    """
+    Download a match summary, errors are only reported because the match is looked up again when saving records
+    :param match_id: int
+    :return: None
+    """
+    try:
+        getMatchSummary(match_id)
+    except Exception as e:
+        print(f"Error occurred while downloading match {match_id}, Error: {e}")
+    pass
+
+
+def prefetchMatchSummaries(match_ids) -> None:
+    """
+    1. Remove duplicate match ids, team mates share most of their matches
+    2. Download the summaries of the distinct matches in parallel (at most matchDownloadWorkers at a time)
+    :param match_ids: list
+    :return: None
+    """
+    # 1. Remove duplicate match ids, team mates share most of their matches
+    distinct_match_ids = list(dict.fromkeys(str(match_id) for match_id in match_ids))
+    print(f"{len(distinct_match_ids)} distinct matches in {len(match_ids)} match records")
+
+    # 2. Download the summaries of the distinct matches in parallel
+    with ThreadPoolExecutor(max_workers=matchDownloadWorkers) as executor:
+        list(executor.map(prefetchMatchSummary, distinct_match_ids))
+    pass
+
+
+def getRunJournalPath() -> str:
+    """
+    :return: str --> journal of the current match
+    """
+    return f"{journalFolder}/{getMatchId(matchUrl)}.txt"
 
-    file_name = f"{player_id}.csv"
-    folder_path = "DataBase/recentMatchRecords"
-    if fileExists(file_name, folder_path):
-        recent_matches = pd.read_csv(f"DataBase/recentMatchRecords/{player_id}.csv")
-        total = 0
-        count = 0
-        for index, row in recent_matches.iterrows():
-            if matchClass == row["MATCH_CLASS"]:
-                total += row["PERFORMANCE"]
-                count += 1
-        if total == 0 or count == 0:
-            return 0
-        return round((total / count), 3)
-    print(f"{player_id} recent performance doesn't exist")
-    return 0
 
+def loadRunJournal() -> None:
+    """
+    1. Forget the journal of the current match when restarting
+    2. Load the (history, player id) units finished by an interrupted run of the current match, those players are
+    skipped so the run resumes where it stopped. When refreshing, units finished more than journalMaxAgeSeconds ago
+    are left out so a player that keeps failing doesn't keep the others from ever being refreshed again
+    :return: None
+    """
+    global runJournal
+
+    # 1. Forget the journal of the current match when restarting
+    if restartRuns and os.path.isfile(getRunJournalPath()):
+        os.remove(getRunJournalPath())
+
+    # 2. Load the (history, player id) units finished by an interrupted run of the current match
+    runJournal = set()
+    if os.path.isfile(getRunJournalPath()):
+        with open(getRunJournalPath()) as journal_file:
+            for line in journal_file:
+                # history player_id finished_at, journals of older versions have no finished_at
+                unit = line.split()
+                if len(unit) < 2:
+                    continue
+                finished_at = float(unit[2]) if len(unit) > 2 else 0
+                if refreshHistories and time.time() - finished_at > journalMaxAgeSeconds:
+                    continue
+                runJournal.add((unit[0], unit[1]))
+    if len(runJournal) > 0:
+        print(f"resuming {matchUrl}, {len(runJournal)} player records already done by the interrupted run")
+    pass
 
-def getAllInternationalPerformance(player_id) -> Union[int, float]:
+
+def isJournaled(history, player_id) -> bool:
     """
-    1. open the csv file as DataFrame
-    2. calculate average performance in all international matches in the last 2 years period
+    :param history: str --> recentMatchRecords or internationalMatchRecords
     :param player_id: int
-    :return: int
+    :return: bool
     """
-    file_name = f"{player_id}.csv"
-    folder_path = "DataBase/internationalMatchRecords"
-    if fileExists(file_name, folder_path):
-        international_matches = pd.read_csv(f"DataBase/internationalMatchRecords/{player_id}.csv")
-        total = 0
-        count = 0
-        for index, row in international_matches.iterrows():
-            total += row["PERFORMANCE"]
-            count += 1
-        if total == 0 or count == 0:
-            return 0
-        return round((total / count), 3)
-    print(f"{player_id} international performance doesn't exist")
-    return 0
+    with runJournalLock:
+        return (history, str(player_id)) in runJournal
 
 
-def getMatchClassInternationalPerformance(player_id) -> Union[int, float]:
+def addToRunJournal(history, player_id) -> None:
     """
-    1. open the csv file as DataFrame
-    2. calculate average performance in similar match class in international matches
+    Add a finished unit to the journal, written straight away so it survives a crash
+    :param history: str --> recentMatchRecords or internationalMatchRecords
     :param player_id: int
-    :return: int
+    :return: None
+    """
+    with runJournalLock:
+        if (history, str(player_id)) in runJournal:
+            return
+        runJournal.add((history, str(player_id)))
+        with open(getRunJournalPath(), "a") as journal_file:
+            journal_file.write(f"{history} {player_id} {int(time.time())}\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+    pass
+
+
+def closeRunJournal() -> None:
+    """
+    Remove the journal once every player of the squad is done, else keep it for the next run to resume
+    :return: None
+    """
+    unfinished = [player_id for player_id in bothSquadDetails.ids()
+                  if not isJournaled("recentMatchRecords", player_id)
+                  or not isJournaled("internationalMatchRecords", player_id)]
+    if len(unfinished) == 0:
+        if os.path.isfile(getRunJournalPath()):
+            os.remove(getRunJournalPath())
+    else:
+        print(f"match records of {len(unfinished)} players failed, rerun to resume from {getRunJournalPath()}")
+    pass
+
+
+def getSquadMatchRecords() -> None:
+    """
+    1. Scrape the recent matches table and international records of each player
+    2. Download the summaries of all distinct matches of the whole squad in one parallel pass
+    3. Save each players' recent and international match records
+    Each player's saved records are journaled, an interrupted run resumes with the players that weren't saved
+    :return: None
+    """
+    global bothSquadDetails, pagesLeft
+
+    loadRunJournal()
+
+    # 1. Scrape the recent matches table and international records of each player
+    with stageTimer("recent records"):
+        pagesLeft = len(bothSquadDetails) * 10
+        recent_match_tables = getRecentMatchTables()
+    with stageTimer("international records"):
+        pagesLeft = len(bothSquadDetails) * 20
+        international_records_dicts = getInternationalRecordsDicts()
+
+    # 2. Download the summaries of all distinct matches of the whole squad in one parallel pass
+    with stageTimer("match summaries"):
+        match_ids = getRecentTablesMatchIds(recent_match_tables)
+        match_ids += getInternationalTablesMatchIds(international_records_dicts)
+        prefetchMatchSummaries(match_ids)
+
+    # 3. Save each players' recent and international match records
+    with stageTimer("recent records"):
+        pagesLeft = len(recent_match_tables) * 10
+        saveRecentMatchTables(recent_match_tables)
+    with stageTimer("international records"):
+        pagesLeft = len(international_records_dicts) * 20
+        saveInternationalRecordsDicts(international_records_dicts)
+    closeRunJournal()
+    pass
+
+
+def addInOrder(values) -> float:
+    """
+    Sum the values one by one in match order, like the forms have always been added up. pandas sum compensates the
+    rounding errors of float additions so its total (and sometimes the rounded form) would differ from stored reports
+    :param values: Series
+    :return: float
+    """
+    return functools.reduce(operator.add, values, 0)
+
+
+def getSquadHistoryForms(history, player_ids) -> dict:
+    """
+    1. Load the performance of every match of all the players in one query
+    2. Sum & count performance of all matches and of the current match class per player in one pass
+    3. Average them rounded to 3 decimals, 0 when the player has no performance
+    :param history: str --> recentMatchRecords or internationalMatchRecords
+    :param player_ids: list
+    :return: dict --> player id: (form, match class form), players without history are left out
     """
     global matchClass
-    file_name = f"{player_id}.csv"
-    folder_path = "DataBase/internationalMatchRecords"
-    if fileExists(file_name, folder_path):
-        international_matches = pd.read_csv(f"DataBase/internationalMatchRecords/{player_id}.csv")
-        total = 0
-        count = 0
-        for index, row in international_matches.iterrows():
-            if matchClass == row["MATCH_CLASS"]:
-                total += row["PERFORMANCE"]
-                count += 1
-        if total == 0 or count == 0:
-            return 0
-        return round((total / count), 3)
-    print(f"{player_id} international performance doesn't exist")
-    return 0
+
+    if len(player_ids) == 0:
+        return {}
+
+    # 1. Load the performance of every match of all the players in one query
+    squad_ids = [int(player_id) for player_id in player_ids]
+    placeholders = ", ".join("?" * len(squad_ids))
+    with closing(getPlayerHistoryConnection()) as connection:
+        downloaded = connection.execute(
+            f"SELECT player_id FROM player_histories WHERE history = ? AND player_id IN ({placeholders})",
+            [history] + squad_ids).fetchall()
+        performances = pd.read_sql_query(
+            f"SELECT player_id, match_class, performance FROM match_records "
+            f"WHERE history = ? AND player_id IN ({placeholders}) ORDER BY player_id, row_number",
+            connection, params=[history] + squad_ids)
+
+    # 2. Sum & count performance of all matches and of the current match class per player in one pass, in match
+    # order (adding 0.0 for the matches of other classes doesn't change the total)
+    performances["performance"] = performances["performance"].astype(float)
+    performances["is_match_class"] = performances["match_class"] == matchClass
+    performances["class_performance"] = performances["performance"].where(performances["is_match_class"], 0.0)
+    squad_totals = performances.groupby("player_id").agg(
+        total=("performance", addInOrder), count=("performance", "size"),
+        class_total=("class_performance", addInOrder), class_count=("is_match_class", "sum"))
+
+    # 3. Average them rounded to 3 decimals, 0 when the player has no performance
+    forms = {}
+    for player_id, in downloaded:
+        form = 0
+        class_form = 0
+        if player_id in squad_totals.index:
+            total, count, class_total, class_count = squad_totals.loc[player_id].tolist()
+            if total != 0 and count != 0:
+                form = round((total / count), 3)
+            if class_total != 0 and class_count != 0:
+                class_form = round((class_total / class_count), 3)
+        forms[player_id] = (form, class_form)
+    return forms
+
+
+def getSquadForms(player_ids) -> dict:
+    """
+    Calculate RECENT_FORM, RECENT_CLASS_FORM, INTERNATIONAL_FORM and INT_CLASS_FORM of all the players at once
+    :param player_ids: list
+    :return: dict --> player id: forms dict
+    """
+    recent_forms = getSquadHistoryForms("recentMatchRecords", player_ids)
+    international_forms = getSquadHistoryForms("internationalMatchRecords", player_ids)
+
+    squad_forms = {}
+    for player_id in player_ids:
+        if int(player_id) not in recent_forms:
+            print(f"{player_id} recent performance doesn't exist")
+        if int(player_id) not in international_forms:
+            print(f"{player_id} international performance doesn't exist")
+        recent_form, recent_class_form = recent_forms.get(int(player_id), (0, 0))
+        international_form, int_class_form = international_forms.get(int(player_id), (0, 0))
+        squad_forms[player_id] = {
+            "RECENT_FORM": recent_form,
+            "RECENT_CLASS_FORM": recent_class_form,
+            "INTERNATIONAL_FORM": international_form,
+            "INT_CLASS_FORM": int_class_form
+        }
+    return squad_forms
 
 
 def getPreMatchStatistics() -> None:
     """
-    1. Create Statistics table dictionary
+    1. Create Statistics table dictionary & calculate the forms of the whole squad at once
     2. Generate table dictionary content
     2.1 Extract name and position from global variable bothSquadDetails
     2.2 Calculate all recent matches form
@@ -775,51 +2467,52 @@ def getPreMatchStatistics() -> None:
     statistics_table = {"NAME": [], "POSITION": [], "RECENT_CLASS_FORM": [],
                         "INT_CLASS_FORM": [], "RECENT_FORM": [], "MATCH_CLASS_FORM": [], "INTERNATIONAL_FORM": [],
                         "RECENT_PREDICTION": [], "INT_PREDICTION": []}
+    squad_forms = getSquadForms(bothSquadDetails.ids())
 
     # 2. Generate table dictionary content
-    for player_id in bothSquadDetails:
+    for player in bothSquadDetails:
         # 2.1 Extract name and position from global variable bothSquadDetails
-        name = bothSquadDetails[player_id]["NAME"]
+        name = player.name
         statistics_table["NAME"].append(name)
 
-        position = bothSquadDetails[player_id]["POSITION"]
+        position = player.position
         statistics_table["POSITION"].append(position)
 
         # 2.2 Calculate all recent matches form
-        recent_all = getAllRecentPerformance(player_id)
+        recent_all = squad_forms[player.id]["RECENT_FORM"]
         statistics_table["RECENT_FORM"].append(recent_all)
-        bothSquadDetails[player_id]["RECENT_FORM"] = recent_all
+        player.recentForm = recent_all
 
         # 2.3 Calculate all international matches form
-        int_all = getAllInternationalPerformance(player_id)
+        int_all = squad_forms[player.id]["INTERNATIONAL_FORM"]
         statistics_table["INTERNATIONAL_FORM"].append(int_all)
-        bothSquadDetails[player_id]["INTERNATIONAL_FORM"] = int_all
+        player.internationalForm = int_all
 
         # 2.4 Calculate all similar class matches form (average of international and recent matches form)
         # 2.4A Calculate similar class recent matches form
-        recent_class = getMatchClassRecentPerformance(player_id)
+        recent_class = squad_forms[player.id]["RECENT_CLASS_FORM"]
         statistics_table["RECENT_CLASS_FORM"].append(recent_class)
 
         # 2.4B Calculate similar class international matches form
-        int_class = getMatchClassInternationalPerformance(player_id)
+        int_class = squad_forms[player.id]["INT_CLASS_FORM"]
         statistics_table["INT_CLASS_FORM"].append(int_class)
 
         # 2.4C Calculate average of both
         match_class_form = (recent_class + int_class) / 2
         statistics_table["MATCH_CLASS_FORM"].append(round(match_class_form, 3))
-        bothSquadDetails[player_id]["RECENT_CLASS_FORM"] = recent_class
-        bothSquadDetails[player_id]["INT_CLASS_FORM"] = int_class
+        player.recentClassForm = recent_class
+        player.intClassForm = int_class
 
         # 2.4D Calculate Recent prediction
         recent_prediction = int(recent_all) + (int(recent_class) * 0.5)
         statistics_table["RECENT_PREDICTION"].append(round(recent_prediction, 3))
-        bothSquadDetails[player_id]["RECENT_PREDICTION"] = round(recent_prediction, 3)
+        player.recentPrediction = round(recent_prediction, 3)
 
         # 2.4E Calculate International prediction
         int_prediction = ((int(recent_all) * (int(recent_class) * 0.5)) + (
                 int(int_all) + (int(int_class) * 0.5))) / 2
         statistics_table["INT_PREDICTION"].append(round(int_prediction, 3))
-        bothSquadDetails[player_id]["INT_PREDICTION"] = round(int_prediction, 3)
+        player.intPrediction = round(int_prediction, 3)
 
     # 3.0 Create csv file from the statistics table dictionary
     match_id = getMatchId(matchUrl)
@@ -833,8 +2526,9 @@ def getPreMatchStatistics() -> None:
 
     sorted_statistics_table_df = statistics_table_df.sort_values(by=['RECENT_PREDICTION'], ascending=False)
 
-    sorted_statistics_table_df.to_csv(file_path, index=False)
-    sorted_statistics_table_df.to_csv("currentMatchReports/preMatchPrediction.csv", index=False)
+    writeCsv(sorted_statistics_table_df, file_path)
+    writeCsv(sorted_statistics_table_df, f"{reportsFolder}/preMatchPrediction.csv")
+    recordRows("preMatchStatistics", len(sorted_statistics_table_df))
 
     pass
 
@@ -852,10 +2546,11 @@ def preMatchPreparation():
     # Start stopwatch
     start = timeit.default_timer()
 
-    getBothSquadDetails()
-    getRecentMatchRecords()
-    getInternationalMatchRecords()
-    getPreMatchStatistics()
+    with stageTimer("squad"):
+        getBothSquadDetails()
+    getSquadMatchRecords()
+    with stageTimer("statistics"):
+        getPreMatchStatistics()
     for i in range(3):
         print("")
 
@@ -918,38 +2613,55 @@ def getCleanNames(team_names_string) -> list:
 def getPlaying11Manually() -> list:
     """
     # 1. Extract playing 11 names of both teams from input and combine them
-    # 2. extract all squad players names from bothSquadDetails
-    # 3. Check if the name exists in bothSquadDetails. if yes extract player id, else take player id from input()
-    # 4. send all the player ids
+    # 2. Check if the name exists in bothSquadDetails (by normalized name), else match it against the squad with the player identity index
+    (fuzzy) and then the exact names & remembered aliases of every player ever seen. If nobody matches take player id
+    from input() and remember the name
+    # 3. send all the player ids
+    In a batch run the names come from PLAYING_XI and the unknown players' ids from PLAYER_IDS of the fixture
     :return: list
     """
-    global bothSquadDetails
+    global bothSquadDetails, batchFixture, matchUrl
 
     # 1. Extract playing 11 names of both teams from input and combine them
     playing_11_names = []
-    team_1_string = input("Enter team 1 names: ")
+    if batchFixture is None:
+        team_1_string = input("Enter team 1 names: ")
+        team_2_string = input("Enter team 2 names: ")
+    elif "PLAYING_XI" in batchFixture:
+        team_1_string, team_2_string = batchFixture["PLAYING_XI"]
+    else:
+        raise ValueError(f"playing xi of {matchUrl} isn't announced, add PLAYING_XI to the fixture")
     playing_11_names += getCleanNames(team_1_string)
-    team_2_string = input("Enter team 2 names: ")
     playing_11_names += getCleanNames(team_2_string)
 
-    # 2. extract all squad players names from bothSquadDetails
-    squad_names = {}
-    for ids in bothSquadDetails:
-        name = bothSquadDetails[ids]["NAME"].lower()
-        squad_names[name] = ids
-
-    # 3. Check if the name exists in bothSquadDetails. if yes extract player id, else take player id from input()
+    # 2. Check if the name exists in bothSquadDetails, else match it with the player identity index
+    identities = getPlayerIdentities()
     playing_11_ids = []
     for player_name in playing_11_names:
-        if player_name.lower() in squad_names:
-            player_id = squad_names[player_name.lower()]
-            playing_11_ids.append(player_id)
+        player = bothSquadDetails.findByName(player_name)
+        if player is not None:
+            playing_11_ids.append(player.id)
+            continue
+
+        # a close name outside the squad is more likely a debutant than a typo, so only exact names there
+        player_id = identities.find(player_name, bothSquadDetails.ids())
+        if player_id is None:
+            player_id = identities.find(player_name, fuzzy=False)
+        if player_id is not None:
+            print(f"{player_name} matched to {identities.getDisplayName(player_id)} ({player_id})")
         else:
             print(f"{player_name} not present in any of the squad")
-            player_id = input(f"{player_name} ESPNCricInfo Details ")
-            playing_11_ids.append(player_id)
+            if batchFixture is None:
+                player_id = input(f"{player_name} ESPNCricInfo Details ")
+            elif player_name in batchFixture.get("PLAYER_IDS", {}):
+                player_id = batchFixture["PLAYER_IDS"][player_name]
+            else:
+                raise ValueError(f"add the ESPNCricInfo id of {player_name} to PLAYER_IDS of the fixture")
+            identities.add(player_id, alias=player_name)
+        playing_11_ids.append(int(player_id))
+    savePlayerIdentities()
 
-    # 4. send all the player ids
+    # 3. send all the player ids
     return playing_11_ids
 
 
@@ -961,17 +2673,20 @@ def extractPlayingXI() -> None:
     2. check if extracted ids are in bothSquadDetails and change the status of PLAYING_11_STATUS in bothSquadDetails
     2.1 if not present then extract player details and add them to bothSquadDetails
     2.2 change the status of PLAYING_11_STATUS of each player in bothSquadDetails
+    In a batch run the playing 11 is taken from the match unless the fixture gives PLAYING_XI
     :return: None
     """
-    global matchUrl, sleepTime, bothSquadDetails, totalPlayers
+    global matchUrl, bothSquadDetails, totalPlayers, batchFixture
 
     # 1. Extract both teams Playing 11 ids
     # 1.1 Check if playing 11 is available
     match_id = getMatchId(matchUrl)
-    time.sleep(sleepTime)
-    available = input("is playing xi available? (y/n) ")
+    if batchFixture is None:
+        available = input("is playing xi available? (y/n) ")
+    else:
+        available = "n" if "PLAYING_XI" in batchFixture else "y"
     if available == "y":
-        match_api = Match(match_id)
+        match_api = getMatch(match_id)
         playing_11_ids = getPlayingXIIds(match_api)
     else:
         playing_11_ids = []
@@ -985,14 +2700,13 @@ def extractPlayingXI() -> None:
     # 2.1 if not present then extract player details and add them to bothSquadDetails
     totalPlayers = len(playing_11_ids)
     for player_id in playing_11_ids:
-        if str(player_id) in bothSquadDetails:
+        if player_id in bothSquadDetails:
             totalPlayers -= 1
             print(
-                f"{bothSquadDetails[str(player_id)]['NAME']} already exists in Squad Details, {totalPlayers} players left  to download")
-            bothSquadDetails[str(player_id)]["PLAYING_11_STATUS"] = True
+                f"{bothSquadDetails.get(player_id).name} already exists in Squad Details, {totalPlayers} players left  to download")
         else:
             getPlayerDetails(player_id)
-            bothSquadDetails[player_id]["PLAYING_11_STATUS"] = True
+        bothSquadDetails.get(player_id).playing11Status = True
 
         # 2.2 change the status of PLAYING_11_STATUS of each player in bothSquadDetails
     pass
@@ -1006,7 +2720,7 @@ def getPlaying11Statistics() -> None:
 
     :return:
     """
-    global matchUrl, sleepTime, bothSquadDetails, totalPlayers
+    global matchUrl, bothSquadDetails, totalPlayers
 
     # 1.0 Create table dictionary with empty values
     table = {"NAME": [], "POSITION": [], "RECENT_FORM": [], "INT_FORM": [], "INT_CLASS_FORM": [],
@@ -1014,29 +2728,29 @@ def getPlaying11Statistics() -> None:
 
     # 2.0 check PLAYING_11_STATUS in bothSquadDetails and extract data and append them to the table
     for player in bothSquadDetails:
-        if bothSquadDetails[player]["PLAYING_11_STATUS"]:
-            name = bothSquadDetails[player]["NAME"]
+        if player.playing11Status:
+            name = player.name
             table["NAME"].append(name)
 
-            position = bothSquadDetails[player]["POSITION"]
+            position = player.position
             table["POSITION"].append(position)
 
-            recent_form = bothSquadDetails[player]["RECENT_FORM"]
+            recent_form = player.recentForm
             table["RECENT_FORM"].append(round(recent_form, 3))
 
-            int_form = bothSquadDetails[player]["INTERNATIONAL_FORM"]
+            int_form = player.internationalForm
             table["INT_FORM"].append(round(int_form, 3))
 
-            recent_class = bothSquadDetails[player]["RECENT_CLASS_FORM"]
+            recent_class = player.recentClassForm
             table["RECENT_CLASS_FORM"].append(round(recent_class, 3))
 
-            int_class = bothSquadDetails[player]["INT_CLASS_FORM"]
+            int_class = player.intClassForm
             table["INT_CLASS_FORM"].append(round(int_class, 3))
 
-            int_class = bothSquadDetails[player]["RECENT_PREDICTION"]
+            int_class = player.recentPrediction
             table["RECENT_PREDICTION"].append(round(int_class, 3))
 
-            int_class = bothSquadDetails[player]["INT_PREDICTION"]
+            int_class = player.intPrediction
             table["INT_PREDICTION"].append(round(int_class, 3))
 
             table["FAN-CODE"].append("0")
@@ -1054,17 +2768,19 @@ def getPlaying11Statistics() -> None:
 
     sorted_statistics_table_df = statistics_table_df.sort_values(by=['RECENT_PREDICTION'], ascending=False)
 
-    sorted_statistics_table_df.to_csv(file_path, index=False)
-    sorted_statistics_table_df.to_csv("currentMatchReports/afterTossPrediction.csv", index=False)
+    writeCsv(sorted_statistics_table_df, file_path)
+    writeCsv(sorted_statistics_table_df, f"{reportsFolder}/afterTossPrediction.csv")
+    recordRows("playing11Statistics", len(sorted_statistics_table_df))
     pass
 
 
 def afterToss():
-    extractPlayingXI()
-    getRecentMatchRecords()
-    getInternationalMatchRecords()
-    getPreMatchStatistics()
-    getPlaying11Statistics()
+    with stageTimer("playing xi"):
+        extractPlayingXI()
+    getSquadMatchRecords()
+    with stageTimer("statistics"):
+        getPreMatchStatistics()
+        getPlaying11Statistics()
     pass
 
 
@@ -1074,13 +2790,19 @@ def checkDirectory() -> None:
     :return: None
     """
     directories = [
-        "DataBase/internationalMatchRecords",
         "DataBase/playing11Statistics",
         "DataBase/preMatchStatistics",
-        "DataBase/recentMatchRecords",
         "DataBase/squadDetails",
+        "DataBase/matchSummaries",
+        "DataBase/matchDetails",
+        "DataBase/httpCache/entries",
+        "DataBase/httpCache/bodies",
+        "DataBase/locks",
+        "DataBase/journals",
         "currentMatchReports"
     ]
+    if recordFolder is not None:
+        directories += [f"{recordFolder}/entries", f"{recordFolder}/bodies"]
 
     for path in directories:
         if os.path.isdir(path):
@@ -1099,7 +2821,7 @@ def clientInputs() -> None:
     5. Check directory before going forward
     :return: None
     """
-    global matchUrl, vpnStatus, sleepTime, currentYear, intPeriod, matchClass
+    global matchUrl, vpnStatus, requestsPerSecond, currentYear, intPeriod, matchClass
 
     matchUrl = ""
     vpnStatus = ""
@@ -1111,7 +2833,7 @@ def clientInputs() -> None:
     # 2. If client is using vpn
     vpnStatus = input("Are you using VPN?(y/n) ")
     if vpnStatus == "y":
-        sleepTime = 0
+        requestsPerSecond = 0
 
     # 3. Check the international period. Not more than 1 year works
     currentYear = 2022
@@ -1125,33 +2847,81 @@ def clientInputs() -> None:
     pass
 
 
+def refreshMatchIndex() -> None:
+    """
+    Add the match ids of the rows appended to allMatchesData.csv since the last refresh to matchIndex, only whole
+    lines are read. Call with matchIndexLock held
+    :return: None
+    """
+    global matchIndexOffset
+
+    if not os.path.isfile(allMatchesDataPath) or os.path.getsize(allMatchesDataPath) == matchIndexOffset:
+        return
+    with open(allMatchesDataPath, "rb") as csv_file:
+        csv_file.seek(matchIndexOffset)
+        new_data = csv_file.read()
+    new_data = new_data[:new_data.rfind(b"\n") + 1]
+    lines = new_data.decode("utf-8").splitlines()
+    if matchIndexOffset == 0:
+        lines = lines[1:]
+    for row in csv.reader(lines):
+        matchIndex.add(int(row[0]))
+    matchIndexOffset += len(new_data)
+    pass
+
+
+def isMatchIndexed(match_id) -> bool:
+    """
+    Check if the match is in allMatchesData.csv
+    :param match_id: int
+    :return: bool
+    """
+    with matchIndexLock:
+        refreshMatchIndex()
+        return int(match_id) in matchIndex
+
+
+def addToMatchIndex(match_data) -> bool:
+    """
+    Append the match to allMatchesData.csv unless it is already there, the lock keeps the check & the append of
+    processes finishing matches at the same time apart
+    :param match_data: list --> values of allMatchesDataColumns
+    :return: bool --> False if the match was already there
+    """
+    with fileLock("allMatchesData"), matchIndexLock:
+        refreshMatchIndex()
+        if int(match_data[0]) in matchIndex:
+            return False
+        if not os.path.isfile(allMatchesDataPath):
+            writeCsv(pd.DataFrame(columns=allMatchesDataColumns), allMatchesDataPath)
+        appendCsv(pd.DataFrame([match_data], columns=allMatchesDataColumns), allMatchesDataPath)
+        refreshMatchIndex()
+    return True
+
+
 def checkReportStatus() -> bool:
     """
-    # 1.0 Extract match id and open the all matches data file
+    # 1.0 Extract match id
     # 2.0 if match id is already in the all matches data then return true else false
     :return: bool
     """
     global matchUrl
-    # 1.0 Extract match id and open the all matches data file
+    # 1.0 Extract match id
     match_id = getMatchId(matchUrl)
-    all_matches_data_df = pd.read_csv("reports/allMatchesData.csv")
 
     # 2.0 if match id is already in the all matches data then return true else false
-    for index, row in all_matches_data_df.iterrows():
-        if row["MATCH_ID"] == int(match_id):
-            return True
-    return False
+    return isMatchIndexed(match_id)
 
 
 def getMatchesData():
     """
     # 1.0 Extract all the details  required for report
-    # 2.0 Open allMatchesData.csv file and add the match details to the file
+    # 2.0 Append the match details to allMatchesData.csv
     :return: None
     """
     # 1.0 Extract all the details  required for report
     match_id = getMatchId(matchUrl)
-    match_api = Match(match_id)
+    match_api = getMatchDetails(match_id)
     total_runs, total_wickets = getMatchTotalRunsAndWickets(match_api)
     home_team = match_api.home_team
     away_team = match_api.team_2_abbreviation
@@ -1164,60 +2934,62 @@ def getMatchesData():
         winning_side = "HOME"
     match_report_path = f"report/results/{match_id}.csv"
 
-    # 2.0 Open allMatchesData.csv file and add the match details to the file
-    df = pd.read_csv("reports/allMatchesData.csv")
-    df.loc[len(df.index)] = [match_id, match_api.series_name, match_api.ground_name, match_api.match_class,
-                             match_api.match_title, match_api.lighting, total_runs, total_wickets,
-                             home_team, away_team, match_api.batting_first,
-                             match_api.match_winner, winning_side, match_report_path]
-    df.to_csv("reports/allMatchesData.csv", index=False)
+    # 2.0 Append the match details to allMatchesData.csv
+    match_data = [match_id, match_api.series_name, match_api.ground_name, match_api.match_class,
+                  match_api.match_title, match_api.lighting, total_runs, total_wickets,
+                  home_team, away_team, match_api.batting_first,
+                  match_api.match_winner, winning_side, match_report_path]
+    if not addToMatchIndex(match_data):
+        print(f"{match_id} is already in {allMatchesDataPath}")
     pass
 
 
 def getPlayersDream11Points(match_df):
     """
-    get player details manually
+    get player details manually, in a batch run from DREAM11 of the fixture
     :param match_df: DataFrame
     :return: List
     """
+    global batchFixture, matchUrl
+
+    if batchFixture is not None and "DREAM11" not in batchFixture:
+        raise ValueError(f"add the players' DREAM11 points of {matchUrl} to the fixture")
+
     print("\nEnter Dream11 Points Manually")
     dream11 = []
     for index, row in match_df.iterrows():
         player_name = row["NAME"]
-        player_points = int(input(f"{player_name}: "))
+        if batchFixture is None:
+            player_points = int(input(f"{player_name}: "))
+        else:
+            player_points = int(batchFixture["DREAM11"][player_name])
         dream11.append(player_points)
     return dream11
 
 
 def getPlayerTeamDetails(match_api, match_df):
     """
-    1.0 extract Team1 and Team2 player Names
-    2.0 add home team player names to team_1_player_names and away team names to team_2_player_names
+    1.0 extract home team and away team players, their known as names are added to the player identity index
+    2.0 collect the player ids of the home team and of the away team
     3.0 set home team name and away team name
-    4.0 find home_away and target_chase details of the player
+    4.0 find home_away and target_chase details of the player, the report NAME is matched to the players of the match
+    with the player identity index. A player who can't be matched is counted as AWAY with a warning
     :param match_api: dict
     :param match_df: dataframe
     :return: list, list
     """
-    # 1.0 extract Team1 and Team2 player Names
-    team_1 = match_api.team_1_players
-    team_2 = match_api.team_2_players
-
-    team_1_player_names = []
-    team_2_player_names = []
-
-    # 2.0 add home team player names to team_1_player_names and away team names to team_2_player_names
-    for i in range(len(team_1)):
-        if match_api.home_team == match_api.team_1_abbreviation:
-            team_1_player_names.append(team_1[i]["known_as"])
-        else:
-            team_1_player_names.append(team_2[i]["known_as"])
+    # 1.0 extract home team and away team players
+    if match_api.home_team == match_api.team_1_abbreviation:
+        home_players, away_players = match_api.team_1_players, match_api.team_2_players
+    else:
+        home_players, away_players = match_api.team_2_players, match_api.team_1_players
+    identities = getPlayerIdentities()
+    for player in home_players + away_players:
+        identities.add(player["object_id"], known_as=player["known_as"])
 
-    for i in range(len(team_2)):
-        if match_api.home_team == match_api.team_1_abbreviation:
-            team_2_player_names.append(team_2[i]["known_as"])
-        else:
-            team_2_player_names.append(team_1[i]["known_as"])
+    # 2.0 collect the player ids of the home team and of the away team
+    home_player_ids = {int(player["object_id"]) for player in home_players}
+    away_player_ids = {int(player["object_id"]) for player in away_players}
 
     # 3.0 set home team name and away team name
     home_team = match_api.home_team
@@ -1235,7 +3007,10 @@ def getPlayerTeamDetails(match_api, match_df):
     ground = []
     for i, r in match_df.iterrows():
         ground.append(match_api.ground_name)
-        if r["NAME"] in team_1_player_names:
+        player_id = identities.find(r["NAME"], home_player_ids | away_player_ids)
+        if player_id is None:
+            print(f"warning: {r['NAME']} isn't a player of {match_api.match_title}, counted as AWAY")
+        if player_id in home_player_ids:
             home_away.append("HOME")
             team.append(home_team)
             opposite_team.append(away_team)
@@ -1251,6 +3026,7 @@ def getPlayerTeamDetails(match_api, match_df):
                 target_chase.append("TARGET")
             else:
                 target_chase.append("CHASE")
+    savePlayerIdentities()
 
     return home_away, target_chase, team, opposite_team, ground
 
@@ -1261,6 +3037,7 @@ def getFinalMatchReport():
     # 2.0 Check if the DREAM11 col is already in playing11Statistics. if not extract each players' points
     # 3.0 extract player-details if necessary
     # 4.0 Rearrange columns of DataFrame
+    # 5.0 Add the report to the consolidated results
     :return: None
     """
     # 1.0 Open the match file from DataBase/playing11Statistics and sort the DF based on NAME col
@@ -1275,7 +3052,7 @@ def getFinalMatchReport():
         match_df["DREAM11"] = dream11
 
     # 3.0 extract player-details if necessary
-    match_api = Match(match_id)
+    match_api = getMatchDetails(match_id)
     home_away, target_chase, team_name, opposite_team, ground_name = getPlayerTeamDetails(match_api, match_df)
     match_df["HOME_AWAY"] = home_away
     match_df["TARGET_CHASE"] = target_chase
@@ -1284,10 +3061,12 @@ def getFinalMatchReport():
     match_df["GROUND"] = ground_name
 
     # 4.0 Rearrange columns of DataFrame
-    cols = ['NAME', 'POSITION', 'GROUND', 'TEAM_NAME', 'VS_TEAM', 'HOME_AWAY', 'TARGET_CHASE', 'RECENT_FORM',
-            'INT_FORM', 'INT_CLASS_FORM', 'RECENT_CLASS_FORM', 'RECENT_PREDICTION', 'INT_PREDICTION', 'DREAM11']
-    match_df = match_df[cols]
-    match_df.to_csv(f"reports/results/{match_id}.csv", index=False)
+    match_df = match_df[reportColumns]
+    writeCsv(match_df, f"reports/results/{match_id}.csv")
+    recordRows("reports", len(match_df))
+
+    # 5.0 Add the report to the consolidated results
+    addToAllResults(match_id, match_api.match_class, match_df)
     pass
 
 
@@ -1297,297 +3076,398 @@ def createReport():
     2.0 Create final match report
     :return: nONE
     """
-    # 1.0 Check if match report already exists:
-    exists = checkReportStatus()
+    with stageTimer("reports"):
+        # 1.0 Check if match report already exists:
+        exists = checkReportStatus()
 
-    # 2.0 Create final match report
-    if not exists:
-        getMatchesData()
-        getFinalMatchReport()
+        # 2.0 Create final match report
+        if not exists:
+            getMatchesData()
+            getFinalMatchReport()
     pass
 
 
-def getAllTop11():
+def buildAllResults() -> pd.DataFrame:
     """
-    # 1.0 Get similar match ids form reports/allMatchesData.csv file
-    # 2.0 create empty top11 dataframe
-    # 3.0 Extract top 5 players from the similar matches and add them to the top11 dataframe
-    # 4.0 Sort top11 dataframe
-    :return: DataFrame
+    Consolidate every match report of reports/allMatchesData.csv into reports/allResults.csv
+    :return: DataFrame --> MATCH_ID, MATCH_CLASS & the report columns
     """
-    global matchUrl, bothSquadDetails
-    # 1.0 Get similar match ids form reports/allMatchesData.csv file
-    all_matches_data_df = pd.read_csv("reports/allMatchesData.csv")
-    match_id = getMatchId(matchUrl)
-    match_api = Match(match_id)
-    match_class = match_api.match_class
-
-    all_match_ids = []
-    for index, row in all_matches_data_df.iterrows():
-        # all_match_ids.append(row["MATCH_ID"])
-        if row["MATCH_CLASS"] == match_class:
-            all_match_ids.append(row["MATCH_ID"])
-
-    # Upgrade under progress
-    both_teams_playing_11_names = []
-    for player_id in bothSquadDetails:
-        if bothSquadDetails[player_id]["PLAYING_11_STATUS"]:
-            both_teams_playing_11_names.append(bothSquadDetails[player_id]["NAME"])
-
-    # 2.0 create empty top11 dataframe
-    all_match_ids.sort()
-    top11_df = pd.DataFrame(
-        columns=['NAME', 'POSITION', 'GROUND', 'TEAM_NAME', 'VS_TEAM', 'HOME_AWAY', 'TARGET_CHASE', 'RECENT_FORM',
-                 'INT_FORM', 'INT_CLASS_FORM', 'RECENT_CLASS_FORM', 'RECENT_PREDICTION', 'INT_PREDICTION', 'DREAM11']
-    )
+    all_matches_data_df = pd.read_csv(allMatchesDataPath)
 
-    # 3.0 Extract top 5 players from the similar matches and add them to the top11 dataframe
-    for matchID in all_match_ids:
-        match_df = pd.read_csv(f"reports/results/{matchID}.csv")
-        match_df = match_df.sort_values(by=['DREAM11'], ascending=False)
+    results = []
+    for match_id, match_class in zip(all_matches_data_df["MATCH_ID"], all_matches_data_df["MATCH_CLASS"]):
+        match_df = pd.read_csv(f"reports/results/{match_id}.csv")[reportColumns]
+        match_df.insert(0, "MATCH_CLASS", match_class)
+        match_df.insert(0, "MATCH_ID", match_id)
+        results.append(match_df)
 
-        # Upgrade under progress
-        rows_list = []
-        row_id = 0
-        for index, row in match_df.iterrows():
-            if row['NAME'] in both_teams_playing_11_names:
-                rows_list.append(row_id)
-            row_id += 1
+    all_results_df = pd.concat(results, ignore_index=True)
+    writeCsv(all_results_df, allResultsPath)
+    print(f"{len(results)} match reports consolidated into {allResultsPath}")
+    return all_results_df
 
-        result = match_df.iloc[[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]]
-        # result = match_df.iloc[[0, 1, 2, 3, 4]]
-        # result = match_df.iloc[[0, 1, 2]]
-        # result = match_df.iloc[rows_list]
 
-        frames = [top11_df, result]
-        top11_df = pd.concat(frames)
-
-    # 4.0 Sort top11 dataframe
-    top11_df = top11_df.sort_values(by=['INT_FORM'], ascending=False)
-    top11_df = top11_df.sort_values(by=['POSITION'], ascending=False)
-    top11_df = top11_df.sort_values(by=['RECENT_PREDICTION'], ascending=False)
-    top11_df.to_csv("currentMatchReports/top11.csv", index=False)
-    return top11_df
+def loadAllResults() -> pd.DataFrame:
+    """
+    Load the consolidated results, building them the first time
+    :return: DataFrame --> MATCH_ID, MATCH_CLASS & the report columns
+    """
+    if not os.path.isfile(allResultsPath):
+        return buildAllResults()
+    return pd.read_csv(allResultsPath)
 
 
-def getTopPlayersInsights(top11_df):
+def addToAllResults(match_id, match_class, match_df) -> None:
     """
-    # 1.0 get frequency count
-    # 2.0 creating the dataset
-    # 3.0 creating the bar plot
-    :param top11_df: DataFrame
-    :return:
+    Append the new match report to the consolidated results (built from all the reports if they don't exist yet)
+    :param match_id: int
+    :param match_class: str
+    :param match_df: DataFrame --> the report columns
+    :return: None
     """
-    # 1.0 get frequency count
-    frequency = {}
-    for index, row in top11_df.iterrows():
-        recent_prediction = round(row["RECENT_PREDICTION"], 1)
-        if recent_prediction not in frequency:
-            frequency[recent_prediction] = 0
-        frequency[recent_prediction] += 1
-
-    # 2.0 creating the dataset
-    form = list(frequency.keys())
-    count = list(frequency.values())
-
-    fig = plt.figure(figsize=(10, 5))
-    plt.xticks(form)
-
-    # 3.0 creating the bar plot
-    plt.bar(form, count, color='maroon',
-            width=0.4)
-
-    plt.xlabel("RECENT PREDICTION")
-    plt.ylabel("COUNT")
-    plt.title("FREQUENCY BASED ON RECENT PREDICTION RESULTS")
-    plt.savefig('currentMatchReports/recent_prediction.png')
-    plt.close(fig)
+    if not os.path.isfile(allResultsPath):
+        buildAllResults()
+        return
+
+    match_df = match_df[reportColumns].copy()
+    match_df.insert(0, "MATCH_CLASS", match_class)
+    match_df.insert(0, "MATCH_ID", match_id)
+    appendCsv(match_df, allResultsPath)
     pass
 
 
-def getTopBattingInsights(top11_df):
+def getAllTop11():
     """
-    # 1.0 get frequency count
-    # 2.0 creating the dataset
-    # 3.0 creating the bar plot
-    :param top11_df: DataFrame
-    :return:
+    # 1.0 Get the class of the current match
+    # 2.0 Get the reports of the matches of the same class from the consolidated results
+    # 3.0 Take the top 11 Dream11 players of each match
+    # 4.0 Sort top11 dataframe
+    :return: DataFrame
     """
-    # 1.0 get frequency count
-    frequency = {}
-    for index, row in top11_df.iterrows():
-        if row["POSITION"] == "2 Batsmen":
-            recent_prediction = round(row["RECENT_PREDICTION"], 1)
-            if recent_prediction not in frequency:
-                frequency[recent_prediction] = 0
-            frequency[recent_prediction] += 1
-
-    # 2.0 creating the dataset
-    form = list(frequency.keys())
-    count = list(frequency.values())
-
-    fig = plt.figure(figsize=(10, 5))
-    plt.xticks(form)
-
-    # 3.0 creating the bar plot
-    plt.bar(form, count, color='maroon',
-            width=0.4)
-
-    plt.xlabel("RECENT PREDICTION of BATTING")
-    plt.ylabel("COUNT")
-    plt.title("BATTING FREQUENCY BASED ON RECENT PREDICTION RESULTS")
-    plt.savefig('currentMatchReports/batting.png')
-    plt.close(fig)
-    pass
+    global matchUrl
+
+    # 1.0 Get the class of the current match
+    match_id = getMatchId(matchUrl)
+    match_class = getMatchDetails(match_id).match_class
+
+    # 2.0 Get the reports of the matches of the same class from the consolidated results
+    all_results_df = loadAllResults()
+    similar_results_df = all_results_df[all_results_df["MATCH_CLASS"] == match_class]
 
+    # 3.0 Take the top 11 Dream11 players of each match
+    top11_df = similar_results_df.sort_values(by=["MATCH_ID", "DREAM11"], ascending=[True, False], kind="stable")
+    top11_df = top11_df.groupby("MATCH_ID").head(11)[reportColumns]
 
-def getTopBowlingInsights(top11_df):
+    # 4.0 Sort top11 dataframe
+    top11_df = top11_df.sort_values(by=['RECENT_PREDICTION', 'POSITION', 'INT_FORM'], ascending=False, kind="stable")
+    writeCsv(top11_df, f"{reportsFolder}/top11.csv")
+    recordRows("top11", len(top11_df))
+    return top11_df
+
+
+def getInsightFrequencies(top11_df) -> dict:
     """
-    # 1.0 get frequency count
-    # 2.0 creating the dataset
-    # 3.0 creating the bar plot
+    1. Count the players of each POSITION & rounded RECENT_PREDICTION in one groupby
+    2. Frequencies of each chart, the all players chart adds up the positions
     :param top11_df: DataFrame
-    :return:
-    """
-    # 1.0 get frequency count
-    frequency = {}
-    for index, row in top11_df.iterrows():
-        if row["POSITION"] == "4 Bowler":
-            recent_prediction = round(row["RECENT_PREDICTION"], 1)
-            if recent_prediction not in frequency:
-                frequency[recent_prediction] = 0
-            frequency[recent_prediction] += 1
-
-    # 2.0 creating the dataset
-    form = list(frequency.keys())
-    count = list(frequency.values())
-
-    fig = plt.figure(figsize=(10, 5))
-    plt.xticks(form)
-
-    # 3.0 creating the bar plot
-    plt.bar(form, count, color='maroon',
-            width=0.4)
-
-    plt.xlabel("RECENT PREDICTION of BOWLING")
-    plt.ylabel("COUNT")
-    plt.title("BOWLING FREQUENCY BASED ON RECENT PREDICTION RESULTS")
-    plt.savefig('currentMatchReports/bowling.png')
-    plt.close(fig)
-    pass
+    :return: dict --> chart file name: {recent prediction: count}
+    """
+    # 1. Count the players of each POSITION & rounded RECENT_PREDICTION in one groupby
+    recent_prediction = top11_df["RECENT_PREDICTION"].astype(float).round(1)
+    counts = top11_df.groupby([top11_df["POSITION"], recent_prediction]).size()
+
+    # 2. Frequencies of each chart, the all players chart adds up the positions
+    frequencies = {}
+    for position, file_name, x_label, title in insightCharts:
+        if position is None:
+            chart_counts = counts.groupby(level=1).sum()
+        elif position in counts.index.get_level_values(0):
+            chart_counts = counts.xs(position, level=0)
+        else:
+            chart_counts = counts.iloc[:0].droplevel(0)
+        frequencies[file_name] = {float(value): int(count) for value, count in chart_counts.items()}
+    return frequencies
 
 
-def getTopAllRounderInsights(top11_df):
+def saveInsightCharts(frequencies) -> None:
     """
-    # 1.0 get frequency count
-    # 2.0 creating the dataset
-    # 3.0 creating the bar plot
-    :param top11_df: DataFrame
-    :return:
+    Draw the bar chart of each insight on one reused figure and save them as insightsFormat (png/svg)
+    Figure is drawn without pyplot, so no GUI backend is ever loaded
+    :param frequencies: dict --> chart file name: {recent prediction: count}
+    :return: None
     """
-    # 1.0 get frequency count
-    frequency = {}
-    for index, row in top11_df.iterrows():
-        if row["POSITION"] == "3 All Rounder":
-            recent_prediction = round(row["RECENT_PREDICTION"], 1)
-            if recent_prediction not in frequency:
-                frequency[recent_prediction] = 0
-            frequency[recent_prediction] += 1
-
-    # 2.0 creating the dataset
-    form = list(frequency.keys())
-    count = list(frequency.values())
-
-    fig = plt.figure(figsize=(10, 5))
-    plt.xticks(form)
-
-    # 3.0 creating the bar plot
-    plt.bar(form, count, color='maroon',
-            width=0.4)
-
-    plt.xlabel("RECENT PREDICTION of ALL ROUNDERS")
-    plt.ylabel("COUNT")
-    plt.title("ALL ROUNDERS FREQUENCY BASED ON RECENT PREDICTION RESULTS")
-    plt.savefig('currentMatchReports/all_rounder.png')
-    plt.close(fig)
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5))
+    ax = fig.add_subplot()
+    for position, file_name, x_label, title in insightCharts:
+        form = list(frequencies[file_name].keys())
+        count = list(frequencies[file_name].values())
+
+        ax.clear()
+        ax.set_xticks(form)
+        ax.bar(form, count, color='maroon', width=0.4)
+        ax.set_xlabel(x_label)
+        ax.set_ylabel("COUNT")
+        ax.set_title(title)
+        with atomicWrite(f'{reportsFolder}/{file_name}.{insightsFormat}', "wb") as chart_file:
+            fig.savefig(chart_file, format=insightsFormat)
     pass
 
 
-def getTopWicketKeeperInsights(top11_df):
+def getInsights():
     """
-    # 1.0 get frequency count
-    # 2.0 creating the dataset
-    # 3.0 creating the bar plot
-    :param top11_df: DataFrame
-    :return:
+    1. Top 11 players of the similar matches
+    2. Frequencies of all the insight charts
+    3. Save the charts, or the frequencies as json for dashboards
+    :return: None
     """
-    # 1.0 get frequency count
-    frequency = {}
-    for index, row in top11_df.iterrows():
-        if row["POSITION"] == "1 Wicketkeeper":
-            recent_prediction = round(row["RECENT_PREDICTION"], 1)
-            if recent_prediction not in frequency:
-                frequency[recent_prediction] = 0
-            frequency[recent_prediction] += 1
-
-    # 2.0 creating the dataset
-    form = list(frequency.keys())
-    count = list(frequency.values())
-
-    fig = plt.figure(figsize=(10, 5))
-    plt.xticks(form)
-
-    # 3.0 creating the bar plot
-    plt.bar(form, count, color='maroon',
-            width=0.4)
-
-    plt.xlabel("RECENT PREDICTION of WICKET KEEPERS")
-    plt.ylabel("COUNT")
-    plt.title("WICKET KEEPERS FREQUENCY BASED ON RECENT PREDICTION RESULTS")
-    plt.savefig('currentMatchReports/Wicketkeeper.png')
-    plt.close(fig)
-    pass
+    with stageTimer("insights"):
+        # 1. Top 11 players of the similar matches
+        top11_df = getAllTop11()
 
+        # 2. Frequencies of all the insight charts
+        frequencies = getInsightFrequencies(top11_df)
 
-def getInsights():
-    top11_df = getAllTop11()
-    getTopPlayersInsights(top11_df)
-    getTopBattingInsights(top11_df)
-    getTopBowlingInsights(top11_df)
-    getTopAllRounderInsights(top11_df)
-    getTopWicketKeeperInsights(top11_df)
+        # 3. Save the charts, or the frequencies as json for dashboards
+        if insightsFormat == "json":
+            insights = {}
+            for position, file_name, x_label, title in insightCharts:
+                frequency = {str(value): count for value, count in frequencies[file_name].items()}
+                insights[file_name] = {"XLABEL": x_label, "TITLE": title, "FREQUENCY": frequency}
+            writeJson(insights, f"{reportsFolder}/insights.json")
+        else:
+            saveInsightCharts(frequencies)
     pass
 
 
 def deleteMatchFiles():
-    global bothSquadDetails, matchUrl
+    global bothSquadDetails, matchUrl, batchFixture
     match_id = getMatchId(matchUrl)
-    squad_ids = []
-    for player_id in bothSquadDetails:
-        squad_ids.append(player_id)
-    # delete files
-    delete_all_files = input("Do you want to delete all the files? (y/n): ")
-    print()
+    squad_ids = bothSquadDetails.ids()
+    # delete files, a batch run only deletes the files of its own match
+    delete_all_files = "n"
+    if batchFixture is None:
+        delete_all_files = input("Do you want to delete all the files? (y/n): ")
+        print()
     if (delete_all_files == "y") and (input("Are you sure? (y/n): ") == "y"):
         shutil.rmtree("DataBase", ignore_errors=True)
         shutil.rmtree("currentMatchReports", ignore_errors=True)
+        with directoryManifestLock:
+            directoryManifest.clear()
 
     else:
-        for player_id in squad_ids:
-            os.remove(f"DataBase/internationalMatchRecords/{player_id}.csv")
-
-            files = os.listdir("DataBase/recentMatchRecords")
-            if f"{player_id}.csv" in files:
-                os.remove(f"DataBase/recentMatchRecords/{player_id}.csv")
+        # the workers of a batch run share the player history store, another match may still need these players
+        if batchWorker:
+            print(f"player histories of {match_id} are kept, other matches of the batch may be using them")
+        else:
+            for player_id in squad_ids:
+                deletePlayerHistory("internationalMatchRecords", player_id)
+                deletePlayerHistory("recentMatchRecords", player_id)
 
         os.remove(f"DataBase/playing11Statistics/{match_id}.csv")
         os.remove(f"DataBase/preMatchStatistics/{match_id}.csv")
         os.remove(f"DataBase/squadDetails/{match_id}.json")
+        unregisterFile(f"{match_id}.json", "DataBase/squadDetails")
+
+    pass
+
+
+def loadFixtures(fixtures_path) -> list:
+    """
+    Read the fixtures of a batch run, a json list with one object per match:
+    MATCH_URL, MATCH_CLASS (T20/Test/ODI) --> required
+    INT_PERIOD, CURRENT_YEAR --> international period, defaults 1 & 2022 like clientInputs
+    STAGES --> any of PRE_MATCH, AFTER_TOSS, INSIGHTS, REPORT, CLEAN_UP, defaults PRE_MATCH & AFTER_TOSS
+    PLAYING_XI --> ["team 1 names", "team 2 names"] when the playing xi isn't in the match details
+    PLAYER_IDS --> name: ESPNCricInfo id of the playing xi players who aren't in the squads
+    DREAM11 --> name: Dream11 points of each playing xi player, needed by REPORT
+    :param fixtures_path: str
+    :return: list
+    """
+    with open(fixtures_path) as json_file:
+        fixtures = json.load(json_file)
+
+    for index, fixture in enumerate(fixtures):
+        for key in ["MATCH_URL", "MATCH_CLASS"]:
+            if key not in fixture:
+                raise ValueError(f"fixture {index} of {fixtures_path} has no {key}")
+    return fixtures
+
+
+def loadFixtureInputs(fixture) -> None:
+    """
+    Batch counterpart of clientInputs
+    1. Match URL, match class and international period from the fixture
+    2. Reports of the match are written in their own folder currentMatchReports/{match id}
+    3. Forget the squad of the previous fixture
+    :param fixture: dict
+    :return: None
+    """
+    global batchFixture, matchUrl, matchClass, currentYear, intPeriod, reportsFolder, bothSquadDetails
+
+    # 1. Match URL, match class and international period from the fixture
+    batchFixture = fixture
+    matchUrl = fixture["MATCH_URL"]
+    matchClass = fixture["MATCH_CLASS"]
+    currentYear = fixture.get("CURRENT_YEAR", 2022)
+    intPeriod = fixture.get("INT_PERIOD", 1)
+
+    # 2. Reports of the match are written in their own folder currentMatchReports/{match id}
+    reportsFolder = f"currentMatchReports/{getMatchId(matchUrl)}"
+    os.makedirs(reportsFolder, exist_ok=True)
 
+    # 3. Forget the squad of the previous fixture
+    bothSquadDetails = PlayerRegistry()
+    pass
+
+
+def runFixture(fixture) -> tuple:
+    """
+    Run the stages of one fixture in their usual order, an error only stops this fixture.
+    The metrics of the fixture are printed at the end.
+    :param fixture: dict
+    :return: tuple --> (match url, None or the error)
+    """
+    stages = [("PRE_MATCH", preMatchPreparation), ("AFTER_TOSS", afterToss), ("INSIGHTS", getInsights),
+              ("REPORT", createReport), ("CLEAN_UP", deleteMatchFiles)]
+    fixture_stages = fixture.get("STAGES", ["PRE_MATCH", "AFTER_TOSS"])
+
+    resetMetrics()
+    try:
+        loadFixtureInputs(fixture)
+        # the later stages need the squad that PRE_MATCH downloads
+        if "PRE_MATCH" not in fixture_stages:
+            with stageTimer("squad"):
+                getBothSquadDetails()
+        for stage, run_stage in stages:
+            if stage in fixture_stages:
+                print(f"{stage} of {fixture['MATCH_URL']}")
+                run_stage()
+    except Exception as e:
+        print(f"Error occurred while running {fixture['MATCH_URL']}, Error: {e}")
+        return fixture["MATCH_URL"], repr(e)
+    finally:
+        printMetricsSummary()
+    return fixture["MATCH_URL"], None
+
+
+def initBatchWorker(offline_mode, refresh_histories, requests_per_second, insights_format, metrics_file, record_folder,
+                    replay_folder, restart_runs) -> None:
+    """
+    Options of the batch run for a worker process, which shares DataBase with the other workers
+    :param offline_mode: bool
+    :param refresh_histories: bool
+    :param requests_per_second: float --> share of the rate limit of this worker
+    :param insights_format: str
+    :param metrics_file: str or None
+    :param record_folder: str or None
+    :param replay_folder: str or None
+    :param restart_runs: bool
+    :return: None
+    """
+    global offlineMode, refreshHistories, requestsPerSecond, insightsFormat, metricsFile, recordFolder, replayFolder
+    global batchWorker, restartRuns
+
+    batchWorker = True
+    offlineMode = offline_mode
+    refreshHistories = refresh_histories
+    requestsPerSecond = requests_per_second
+    insightsFormat = insights_format
+    metricsFile = metrics_file
+    recordFolder = record_folder
+    replayFolder = replay_folder
+    restartRuns = restart_runs
     pass
 
 
+def runBatch(fixtures, jobs=1) -> list:
+    """
+    1. Run the fixtures one after the other, or with more than one job in that many worker processes
+        (each process has its own copy of the match globals, the rate limit is split between them). The processes
+        share the http cache, match summaries & player history store of DataBase, a page or match needed by
+        several fixtures is downloaded once by whichever process gets to it first (see fileLock)
+    2. Print what happened to each fixture
+    :param fixtures: list
+    :param jobs: int
+    :return: list --> (match url, None or the error) of each fixture
+    """
+    # 1. Run the fixtures one after the other, or with more than one job in that many worker processes
+    if jobs <= 1 or len(fixtures) <= 1:
+        results = [runFixture(fixture) for fixture in fixtures]
+    else:
+        jobs = min(jobs, len(fixtures))
+        worker_options = (offlineMode, refreshHistories, requestsPerSecond / jobs, insightsFormat, metricsFile,
+                          recordFolder, replayFolder, restartRuns)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=initBatchWorker, initargs=worker_options) as executor:
+            results = list(executor.map(runFixture, fixtures))
+
+    # 2. Print what happened to each fixture
+    for match_url, error in results:
+        print(f"{'done' if error is None else 'failed'}: {match_url} {error or ''}")
+    return results
+
+
+def parseArguments(arguments=None) -> argparse.Namespace:
+    """
+    Command line options of main.py
+    :param arguments: list --> defaults to sys.argv
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Predict cricket player form by scraping ESPNCricInfo")
+    parser.add_argument("--offline", action="store_true",
+                        help=f"serve every page from {httpCacheFolder} and never touch the network")
+    parser.add_argument("--migrate-history", action="store_true",
+                        help=f"copy the per player csv files of DataBase into {playerHistoryPath} and exit")
+    parser.add_argument("--recompute-performance", action="store_true",
+                        help="recalculate PERFORMANCE of every stored match record (after changing wicketPoints) and exit")
+    parser.add_argument("--refresh", action="store_true",
+                        help="add the matches played since to the stored player histories instead of reusing them as is")
+    parser.add_argument("--restart", action="store_true",
+                        help=f"forget the journal of an interrupted run in {journalFolder} and download every player")
+    parser.add_argument("--batch", metavar="FIXTURES",
+                        help="run the matches of a fixtures json file without any prompt (see loadFixtures) and exit")
+    parser.add_argument("--jobs", type=int, default=1, help="number of matches of the batch run at the same time")
+    parser.add_argument("--vpn", action="store_true", help="no rate limit on the downloads of the batch run")
+    parser.add_argument("--insights-format", choices=["png", "svg", "json"], default=insightsFormat,
+                        help="save the insight charts as png/svg, or their frequencies as json")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="append the time of each stage and the run's metrics summary to FILE as json lines")
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument("--record", metavar="FOLDER",
+                         help="save every response of the run (Match downloads included) in the FOLDER archive")
+    archive.add_argument("--replay", metavar="FOLDER",
+                         help="serve every response from the FOLDER archive of --record, never touch the network")
+    return parser.parse_args(arguments)
+
+
 if __name__ == '__main__':
+    arguments = parseArguments()
+    offlineMode = arguments.offline
+    refreshHistories = arguments.refresh
+    restartRuns = arguments.restart
+    insightsFormat = arguments.insights_format
+    metricsFile = arguments.metrics
+    recordFolder = arguments.record
+    replayFolder = arguments.replay
+
+    if arguments.migrate_history:
+        checkDirectory()
+        migratePlayerHistoryCsv()
+        raise SystemExit(0)
+
+    if arguments.recompute_performance:
+        checkDirectory()
+        recomputePerformance()
+        raise SystemExit(0)
+
+    if arguments.batch:
+        if arguments.vpn:
+            requestsPerSecond = 0
+        checkDirectory()
+        batchResults = runBatch(loadFixtures(arguments.batch), arguments.jobs)
+        raise SystemExit(0 if all(error is None for match_url, error in batchResults) else 1)
+
     clientInputs()
     preMatchPreparation()
 
@@ -1602,3 +3482,5 @@ if __name__ == '__main__':
     if tossStatus and (input("Is the match over? (y/n) ") == "y"):
         createReport()
         deleteMatchFiles()
+
+    printMetricsSummary()
@@ -0,0 +1,150 @@
+"""
+Compare parse time and peak memory of the scraper pages between parsing the whole page (old approach) and parsing
+only the needed tags with the SoupStrainers of main.py.
+
+python parsingBenchmark.py                          --> every page cached in DataBase/httpCache
+python parsingBenchmark.py matches:page.html ...    --> given pages, kind is squad/overview/matches/international
+"""
+import argparse
+import json
+import os
+import timeit
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import main
+
+
+def fullSquad(html_text):
+    soup = BeautifulSoup(html_text, "lxml")
+    return soup.find_all("tbody")[0].find_all('a', href=True)
+
+
+def strainedSquad(html_text):
+    soup = main.parsePage(html_text, main.squadStrainer)
+    return soup.find_all("tbody")[0].find_all('a', href=True)
+
+
+def fullOverview(html_text):
+    soup = BeautifulSoup(html_text, "lxml")
+    tab_widgets = soup.find_all("a", class_="ds-h-10")
+    return [soup.find_all("a", class_="ds-h-10")[i]['href'] for i in range(len(tab_widgets))]
+
+
+def strainedOverview(html_text):
+    soup = main.parsePage(html_text, main.tabWidgetsStrainer)
+    return [tab_widget['href'] for tab_widget in soup.find_all("a", class_="ds-h-10")]
+
+
+def fullMatches(html_text):
+    soup = BeautifulSoup(html_text, "lxml")
+    return soup.find_all("th"), soup.find_all("td")
+
+
+def strainedMatches(html_text):
+    soup = main.parsePage(html_text, main.recentMatchesStrainer)
+    return soup.find_all("th"), soup.find_all("td")
+
+
+def fullInternational(html_text):
+    soup = BeautifulSoup(html_text, "lxml")
+    if len(soup.find_all("tr", class_="headlinks")) == 0:
+        return None
+    table_data = soup.find_all("table", class_="engineTable")[3]
+    return table_data.find_all("th"), table_data.find_all("td")
+
+
+def strainedInternational(html_text):
+    soup = main.parsePage(html_text, main.internationalRecordsStrainer)
+    if len(soup.find_all("tr", class_="headlinks")) == 0:
+        return None
+    table_data = soup.find_all("table", class_="engineTable")[3]
+    return table_data.find_all("th"), table_data.find_all("td")
+
+
+# kind --> (url part, old parser, strained parser)
+pageKinds = {
+    "squad": ("/match-squads", fullSquad, strainedSquad),
+    "international": ("stats.espncricinfo.com/ci/engine/player", fullInternational, strainedInternational),
+    "matches": ("/matches", fullMatches, strainedMatches),
+    "overview": ("/cricketers/", fullOverview, strainedOverview)
+}
+
+
+def getPageKind(url):
+    """
+    :param url: str
+    :return: str or None
+    """
+    for kind in pageKinds:
+        if pageKinds[kind][0] in url:
+            return kind
+    return None
+
+
+def getCachedPages() -> list:
+    """
+    All the scraper pages stored in the http cache
+    :return: list --> (kind, name, html text)
+    """
+    pages = []
+    entries_folder = f"{main.httpCacheFolder}/entries"
+    if not os.path.isdir(entries_folder):
+        return pages
+    for entry_name in sorted(os.listdir(entries_folder)):
+        with open(f"{entries_folder}/{entry_name}") as json_file:
+            entry = json.load(json_file)
+        kind = getPageKind(entry["URL"])
+        if kind is None or "athletes" in entry["URL"] or "/matches/engine" in entry["URL"]:
+            continue
+        pages.append((kind, entry["URL"], main.buildCachedResponse(entry["URL"], entry).text))
+    return pages
+
+
+def getPeakMemory(parser, html_text) -> int:
+    """
+    Peak bytes allocated while parsing the page
+    """
+    tracemalloc.start()
+    parser(html_text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def benchmarkPage(kind, html_text, repeat) -> dict:
+    """
+    Best parse time of `repeat` runs and peak memory of the old and the strained parser
+    """
+    url_part, full_parser, strained_parser = pageKinds[kind]
+    if full_parser(html_text) != strained_parser(html_text):
+        print(f"warning: {kind} page gives different results with the strained parser")
+
+    return {
+        "FULL_MS": min(timeit.repeat(lambda: full_parser(html_text), number=1, repeat=repeat)) * 1000,
+        "STRAINED_MS": min(timeit.repeat(lambda: strained_parser(html_text), number=1, repeat=repeat)) * 1000,
+        "FULL_PEAK_KB": getPeakMemory(full_parser, html_text) / 1024,
+        "STRAINED_PEAK_KB": getPeakMemory(strained_parser, html_text) / 1024
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark parsing of the ESPNCricInfo scraper pages")
+    parser.add_argument("pages", nargs="*", help="kind:path of saved pages, defaults to the http cache")
+    parser.add_argument("--repeat", type=int, default=5, help="parse each page this many times, best time is kept")
+    arguments = parser.parse_args()
+
+    pages = []
+    for page in arguments.pages:
+        kind, path = page.split(":", 1)
+        with open(path, encoding="utf-8") as html_file:
+            pages.append((kind, path, html_file.read()))
+    if len(arguments.pages) == 0:
+        pages = getCachedPages()
+
+    print(f"{'KIND':<14}{'FULL ms':>10}{'STRAINED ms':>13}{'FULL KB':>10}{'STRAINED KB':>13}  PAGE")
+    for kind, name, html_text in pages:
+        result = benchmarkPage(kind, html_text, arguments.repeat)
+        print(f"{kind:<14}{result['FULL_MS']:>10.2f}{result['STRAINED_MS']:>13.2f}"
+              f"{result['FULL_PEAK_KB']:>10.0f}{result['STRAINED_PEAK_KB']:>13.0f}  {name}")
@@ -1,100 +1,135 @@
-import json
+"""
+Backfill of reports/results: re-derive VS_TEAM & GROUND of every match report listed in reports/allMatchesData.csv
+and rewrite the report with the report columns.
+
+Matches are worked on by a pool of workers, each finished match id is added to the journal so an interrupted run
+resumes where it stopped, the journal is removed once every match is done. Match details come from DataBase/matchDetails (see main.getMatchDetails), a rerun doesn't
+download the matches again.
+
+python reportsModifyingCode.py              --> resume the backfill
+python reportsModifyingCode.py --restart    --> forget the journal and redo every match
+"""
+import argparse
 import os
-import re
-import time
-import timeit
-from typing import Union
-import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
-from bs4 import BeautifulSoup
-from espncricinfo.match import Match
-import matplotlib.pyplot as plt
 
-import requests
+import main
 
+journalPath = "reports/backfillJournal.txt"
+journalLock = threading.Lock()
+backfillWorkers = 8
 
-def getPlayerTeamDetails(match_api, match_df):
+
+def readJournal() -> set:
     """
-    1.0 extract Team1 and Team2 player Names
-    2.0 add home team player names to team_1_player_names and away team names to team_2_player_names
-    3.0 set home team name and away team name
-    4.0 find home_away and target_chase details of the player
-    :param match_api: dict
-    :param match_df: dataframe
-    :return: list, list
+    Match ids finished by the previous runs
+    :return: set --> match ids as str
     """
-    # 1.0 extract Team1 and Team2 player Names
-    team_1 = match_api.team_1_players
-    team_2 = match_api.team_2_players
-
-    team_1_player_names = []
-    team_2_player_names = []
-
-    # 2.0 add home team player names to team_1_player_names and away team names to team_2_player_names
-    for i in range(len(team_1)):
-        if match_api.home_team == match_api.team_1_abbreviation:
-            team_1_player_names.append(team_1[i]["known_as"])
-        else:
-            team_1_player_names.append(team_2[i]["known_as"])
-
-    for i in range(len(team_2)):
-        if match_api.home_team == match_api.team_1_abbreviation:
-            team_2_player_names.append(team_2[i]["known_as"])
-        else:
-            team_2_player_names.append(team_1[i]["known_as"])
-
-    # 3.0 set home team name and away team name
-    home_team = match_api.home_team
-    away_team = match_api.team_2_abbreviation
-    if home_team == match_api.team_2_abbreviation:
-        away_team = match_api.team_1_abbreviation
-
-    team_batting_first = match_api.batting_first
-
-    # 4.0 find home_away and target_chase details of the player
-    home_away = []
-    target_chase = []
-    team = []
-    opposite_team = []
-    ground = []
-    for i, r in match_df.iterrows():
-        ground.append(match_api.ground_name)
-        if r["NAME"] in team_1_player_names:
-            home_away.append("HOME")
-            team.append(home_team)
-            opposite_team.append(away_team)
-            if home_team == team_batting_first:
-                target_chase.append("TARGET")
-            else:
-                target_chase.append("CHASE")
-        else:
-            home_away.append("AWAY")
-            team.append(away_team)
-            opposite_team.append(home_team)
-            if away_team == team_batting_first:
-                target_chase.append("TARGET")
-            else:
-                target_chase.append("CHASE")
-
-    return home_away, target_chase, team, opposite_team, ground
-
-
-path = "reports/allMatchesData.csv"
-report_df = pd.read_csv(path)
-
-for index, row in report_df.iterrows():
-    match_id = row["MATCH_ID"]
-    print(f"working on {match_id}")
+    if not os.path.isfile(journalPath):
+        return set()
+    with open(journalPath) as journal_file:
+        return {line.strip() for line in journal_file if line.strip() != ""}
+
 
-    match_api = Match(match_id)
+def addToJournal(match_id) -> None:
+    """
+    Add a finished match id to the journal, written straight away so it survives a crash
+    :param match_id: int
+    :return: None
+    """
+    with journalLock:
+        with open(journalPath, "a") as journal_file:
+            journal_file.write(f"{match_id}\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+    pass
+
+
+def backfillMatchReport(match_id) -> None:
+    """
+    1. Re-derive the team details of the players from the match details
+    2. Rewrite the match report with the report columns
+    :param match_id: int
+    :return: None
+    """
+    # 1. Re-derive the team details of the players from the match details
+    match_api = main.getMatchDetails(match_id)
     match_df = pd.read_csv(f"reports/results/{match_id}.csv")
-    home_away, target_chase, team, opposite_team, ground_name = getPlayerTeamDetails(match_api, match_df)
+    home_away, target_chase, team, opposite_team, ground_name = main.getPlayerTeamDetails(match_api, match_df)
     match_df["VS_TEAM"] = opposite_team
     match_df["GROUND"] = ground_name
 
-    cols = ['NAME', 'POSITION', 'GROUND', 'TEAM_NAME', 'VS_TEAM', 'HOME_AWAY', 'TARGET_CHASE', 'RECENT_FORM',
-            'INT_FORM', 'INT_CLASS_FORM',
-            'RECENT_CLASS_FORM', 'RECENT_PREDICTION', 'INT_PREDICTION', 'DREAM11']
-    match_df = match_df[cols]
-    match_df.to_csv(f"reports/results/{match_id}.csv", index=False)
+    # 2. Rewrite the match report with the report columns
+    match_df = match_df[main.reportColumns]
+    main.writeCsv(match_df, f"reports/results/{match_id}.csv")
+    pass
+
+
+def backfillMatch(match_id) -> tuple:
+    """
+    Backfill one match and journal it, an error only stops this match
+    :param match_id: int
+    :return: tuple --> (match id, None or the error)
+    """
+    print(f"working on {match_id}")
+    try:
+        backfillMatchReport(match_id)
+    except Exception as e:
+        print(f"Error occurred while working on {match_id}, Error: {e}")
+        return match_id, repr(e)
+    addToJournal(match_id)
+    return match_id, None
+
+
+def runBackfill(restart=False, workers=backfillWorkers) -> list:
+    """
+    1. Forget the journal when restarting
+    2. Leave out the matches finished by the previous runs
+    3. Backfill the remaining matches with a pool of workers
+    4. Consolidate the rewritten reports again (reports/allResults.csv)
+    5. Remove the journal once every match is done, so the next backfill goes through all the matches again
+    :param restart: bool
+    :param workers: int
+    :return: list --> (match id, error) of the failed matches
+    """
+    # 1. Forget the journal when restarting
+    if restart and os.path.isfile(journalPath):
+        os.remove(journalPath)
+
+    # 2. Leave out the matches finished by the previous runs
+    report_df = pd.read_csv(main.allMatchesDataPath)
+    finished_match_ids = readJournal()
+    match_ids = [match_id for match_id in report_df["MATCH_ID"] if str(match_id) not in finished_match_ids]
+    print(f"{len(match_ids)} matches to backfill, {len(report_df) - len(match_ids)} already done")
+
+    # 3. Backfill the remaining matches with a pool of workers
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(backfillMatch, match_ids))
+    failed = [(match_id, error) for match_id, error in results if error is not None]
+    print(f"{len(match_ids) - len(failed)} matches backfilled, {len(failed)} failed (rerun to retry them)")
+
+    # 4. Consolidate the rewritten reports again
+    if len(match_ids) > len(failed):
+        main.buildAllResults()
+
+    # 5. Remove the journal once every match is done
+    if len(failed) == 0 and os.path.isfile(journalPath):
+        os.remove(journalPath)
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Backfill the match reports of reports/results")
+    parser.add_argument("--restart", action="store_true", help="forget the journal and redo every match")
+    parser.add_argument("--workers", type=int, default=backfillWorkers, help="matches worked on at the same time")
+    parser.add_argument("--vpn", action="store_true", help="no rate limit on the match downloads")
+    arguments = parser.parse_args()
+
+    if arguments.vpn:
+        main.requestsPerSecond = 0
+    main.checkDirectory()
+    failedMatches = runBackfill(arguments.restart, arguments.workers)
+    raise SystemExit(0 if len(failedMatches) == 0 else 1)
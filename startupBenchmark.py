@@ -0,0 +1,86 @@
+"""
+Cold start time of each main.py CLI mode, measured in a fresh interpreter with python -X importtime.
+Every mode is run in an empty temporary folder so nothing in DataBase is touched, the interactive mode stops at the
+first prompt (stdin is empty) and the batch mode at its missing fixtures file.
+
+python startupBenchmark.py               --> every mode, best of 5 runs
+python startupBenchmark.py --repeat 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+mainPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# mode --> main.py arguments
+cliModes = {
+    "interactive": [],
+    "offline": ["--offline"],
+    "batch": ["--batch", "missingFixtures.json"],
+    "migrate-history": ["--migrate-history"],
+    "recompute-performance": ["--recompute-performance"],
+    "help": ["--help"]
+}
+
+
+def getImportTimes(stderr_text) -> dict:
+    """
+    Cumulative import time of each top level package from the -X importtime output
+    :param stderr_text: str
+    :return: dict --> package: milliseconds
+    """
+    import_times = {}
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, package = line[len("import time:"):].split("|")
+        if package.startswith("  ") or not cumulative_us.strip().isdigit():
+            continue
+        import_times[package.strip()] = int(cumulative_us) / 1000
+    return import_times
+
+
+def runMode(arguments, folder) -> tuple:
+    """
+    Run main.py once in a fresh interpreter
+    :param arguments: list
+    :param folder: str --> working folder of the run
+    :return: tuple --> (wall time ms, import times dict)
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", mainPath] + arguments, cwd=folder,
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    return wall_ms, getImportTimes(completed.stderr)
+
+
+def benchmarkMode(arguments, repeat) -> dict:
+    """
+    Best wall time of `repeat` runs, with the import times of that run
+    """
+    runs = []
+    for i in range(repeat):
+        with tempfile.TemporaryDirectory() as folder:
+            runs.append(runMode(arguments, folder))
+    wall_ms, import_times = min(runs, key=lambda run: run[0])
+    return {
+        "WALL_MS": wall_ms,
+        "IMPORT_MS": sum(import_times.values()),
+        "HEAVIEST": sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:3]
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of each main.py CLI mode")
+    parser.add_argument("--repeat", type=int, default=5, help="run each mode this many times, best time is kept")
+    parser.add_argument("modes", nargs="*", default=list(cliModes), help=f"modes to run: {', '.join(cliModes)}")
+    arguments = parser.parse_args()
+
+    print(f"{'MODE':<24}{'WALL ms':>10}{'IMPORT ms':>11}  HEAVIEST IMPORTS")
+    for mode in arguments.modes:
+        result = benchmarkMode(cliModes[mode], arguments.repeat)
+        heaviest = ", ".join(f"{package} {milliseconds:.0f}" for package, milliseconds in result["HEAVIEST"])
+        print(f"{mode:<24}{result['WALL_MS']:>10.0f}{result['IMPORT_MS']:>11.0f}  {heaviest}")